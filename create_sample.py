@@ -2,56 +2,73 @@
 """Create a sample PPTX file for testing the analyzer."""
 
 import io
-from PIL import Image
+import struct
+import zlib
 from pptx import Presentation
 from pptx.util import Inches
 
+# RGB values for the fixture colors; avoids importing Pillow just for ImageColor
+COLORS = {
+    'red': (255, 0, 0),
+    'green': (0, 128, 0),
+    'blue': (0, 0, 255),
+}
+
+def png_chunk(chunk_type, data):
+    """Build a PNG chunk (length, type, data, CRC)."""
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
 def create_image(width, height, color):
-    """Create a simple colored image."""
-    img = Image.new('RGB', (width, height), color=color)
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
-    return img_bytes
+    """Create a simple colored image and return its PNG bytes."""
+    # Flat color needs no PNG prediction filter (type 0), so the rows can be
+    # deflated directly at the fastest level without Pillow's adaptive filtering.
+    # Every row is identical, so one row buffer is streamed through the
+    # compressor instead of materializing the full pixel buffer.
+    row = b'\x00' + bytes(COLORS[color]) * width
+    compressor = zlib.compressobj(1)
+    idat = b''.join([compressor.compress(row) for _ in range(height)]) + compressor.flush()
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    png = (
+        b'\x89PNG\r\n\x1a\n'
+        + png_chunk(b'IHDR', ihdr)
+        + png_chunk(b'IDAT', idat)
+        + png_chunk(b'IEND', b'')
+    )
+    return png
+
+# Unique images, each encoded once: (width, height, color)
+IMAGES = {
+    'large': (1920, 1080, 'blue'),
+    'medium': (800, 600, 'green'),
+    'logo': (200, 200, 'red'),  # Company logo - will appear on multiple slides
+}
+
+# Slide specs: (layout index, title, image name, (left, top, width) in EMU)
+SLIDES = [
+    (5, "Marketing Campaign Photos", 'large', (Inches(1), Inches(1), Inches(6))),  # Large image (will be heaviest)
+    (5, "Product Screenshots", 'medium', (Inches(2), Inches(2), Inches(4))),
+    (5, "Company Overview", 'logo', (Inches(3), Inches(3), Inches(1.5))),
+    (5, "Contact Information", 'logo', (Inches(8), Inches(0.5), Inches(1))),  # Same logo (shared media test)
+    (1, "Thank You", None, None),  # No media (text only)
+]
 
 # Create presentation
 prs = Presentation()
 prs.slide_width = Inches(10)
 prs.slide_height = Inches(7.5)
 
-# Slide 1: Large image (will be heaviest)
-slide1 = prs.slides.add_slide(prs.slide_layouts[5])
-if slide1.shapes.title:
-    slide1.shapes.title.text = "Marketing Campaign Photos"
-large_img = create_image(1920, 1080, 'blue')
-slide1.shapes.add_picture(large_img, Inches(1), Inches(1), width=Inches(6))
-
-# Slide 2: Medium image
-slide2 = prs.slides.add_slide(prs.slide_layouts[5])
-if slide2.shapes.title:
-    slide2.shapes.title.text = "Product Screenshots"
-medium_img = create_image(800, 600, 'green')
-slide2.shapes.add_picture(medium_img, Inches(2), Inches(2), width=Inches(4))
-
-# Slide 3: Small image (company logo - will appear on multiple slides)
-slide3 = prs.slides.add_slide(prs.slide_layouts[5])
-if slide3.shapes.title:
-    slide3.shapes.title.text = "Company Overview"
-small_img = create_image(200, 200, 'red')
-slide3.shapes.add_picture(small_img, Inches(3), Inches(3), width=Inches(1.5))
-
-# Slide 4: Same small image (shared media test)
-slide4 = prs.slides.add_slide(prs.slide_layouts[5])
-if slide4.shapes.title:
-    slide4.shapes.title.text = "Contact Information"
-small_img2 = create_image(200, 200, 'red')  # Same content as slide 3
-slide4.shapes.add_picture(small_img2, Inches(8), Inches(0.5), width=Inches(1))
-
-# Slide 5: No media (text only)
-slide5 = prs.slides.add_slide(prs.slide_layouts[1])
-if slide5.shapes.title:
-    slide5.shapes.title.text = "Thank You"
+images = {name: create_image(*spec) for name, spec in IMAGES.items()}
+# Resolve each distinct layout once rather than indexing slide_layouts per slide
+layouts = {idx: prs.slide_layouts[idx] for idx in {spec[0] for spec in SLIDES}}
+
+for layout_idx, title, image_name, position in SLIDES:
+    slide = prs.slides.add_slide(layouts[layout_idx])
+    slide.shapes.title.text = title  # Layouts 1 and 5 always have a title placeholder
+    if image_name:
+        left, top, width = position
+        # Shared images reuse the same encoded bytes rather than re-encoding
+        slide.shapes.add_picture(io.BytesIO(images[image_name]), left, top, width=width)
 
 # Save
 prs.save('sample_presentation.pptx')
-print("Created sample_presentation.pptx with 5 slides")
+print(f"Created sample_presentation.pptx with {len(SLIDES)} slides")
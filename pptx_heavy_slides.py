@@ -8,21 +8,104 @@ due to embedded media (images, videos, audio).
 
 import argparse
 import csv
+import functools
 import io
 import json
 import logging
+import posixpath
+import shutil
+import struct
 import sys
+import zipfile
 from pathlib import Path
-from typing import TypedDict
+from typing import IO, TypedDict
 from collections import defaultdict
+from operator import itemgetter
 
-from PIL import Image
-from pptx import Presentation
-from pptx.enum.shapes import MSO_SHAPE_TYPE
+from lxml import etree
+
+# python-pptx and Pillow are imported inside the functions that need them, so
+# --help, --version and the ZIP-based masters/layouts paths start quickly
 
 
 __version__ = "1.0.0"
 
+# XML namespaces used when reading PresentationML parts directly
+NAMESPACES = {
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'p14': 'http://schemas.microsoft.com/office/powerpoint/2010/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+
+# Whether a p:pic is an audio/video shape rather than a picture. PowerPoint marks
+# video with a:videoFile and audio with a:audioFile (python-pptx writes both kinds
+# as a:videoFile).
+IS_MEDIA_PIC_XPATH = etree.XPath(
+    'boolean(p:nvPicPr/p:nvPr/a:videoFile | p:nvPicPr/p:nvPr/a:audioFile)',
+    namespaces=NAMESPACES
+)
+
+# Relationship id of an audio/video shape's media part, compiled once. PowerPoint
+# records it as r:embed on p14:media and as r:link on a:videoFile/a:audioFile.
+MEDIA_RID_XPATH = etree.XPath(
+    './/p14:media/@r:embed | .//a:videoFile/@r:link | .//a:audioFile/@r:link',
+    namespaces=NAMESPACES
+)
+
+# Picture shapes on a slide, layout or master (including inside groups), and the
+# relationship id of their image. Audio/video shapes are p:pic too; skip them.
+# As in python-pptx, a top-level p:pic with a p:ph is a placeholder, not a picture.
+PICTURE_BLIP_RIDS_XPATH = etree.XPath(
+    'p:cSld/p:spTree/p:pic[not(p:nvPicPr/p:nvPr/a:videoFile | p:nvPicPr/p:nvPr/a:audioFile'
+    ' | p:nvPicPr/p:nvPr/p:ph)]'
+    '/p:blipFill/a:blip/@r:embed'
+    ' | p:cSld/p:spTree//p:grpSp/p:pic[not(p:nvPicPr/p:nvPr/a:videoFile | p:nvPicPr/p:nvPr/a:audioFile)]'
+    '/p:blipFill/a:blip/@r:embed',
+    namespaces=NAMESPACES
+)
+
+# Whether a slide has any picture or audio/video shape, including inside groups
+SLIDE_HAS_PICTURE_XPATH = etree.XPath('boolean(p:cSld/p:spTree//p:pic)', namespaces=NAMESPACES)
+
+RT_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+RT_SLIDE_LAYOUT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout'
+RID_ATTR = f"{{{NAMESPACES['r']}}}id"
+P_PIC_TAG = f"{{{NAMESPACES['p']}}}pic"
+P_GRPSP_TAG = f"{{{NAMESPACES['p']}}}grpSp"
+P_SP_TAG = f"{{{NAMESPACES['p']}}}sp"
+A_BR_TAG = f"{{{NAMESPACES['a']}}}br"
+TEXT_RUN_TAGS = (f"{{{NAMESPACES['a']}}}r", f"{{{NAMESPACES['a']}}}fld", A_BR_TAG)
+CT_DEFAULT_TAG = '{http://schemas.openxmlformats.org/package/2006/content-types}Default'
+CT_OVERRIDE_TAG = '{http://schemas.openxmlformats.org/package/2006/content-types}Override'
+
+# MediaItem type for an audio/video part, by the major type of its content type
+MEDIA_TYPE_BY_MAJOR_TYPE = {'video': 'video', 'audio': 'audio'}
+
+# Media formats that are already compressed; deflating them again costs CPU for
+# no size gain, so delete_unused_layouts writes them with ZIP_STORED
+COMPRESSED_MEDIA_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.mp4', '.m4v', '.mov', '.mp3', '.m4a', '.wmv', '.wma'
+)
+
+
+# Image header signatures read by sniff_image_header
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# JPEG start-of-frame markers carry the image size (DHT, JPG and DAC share the range)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Units for format_bytes, each 1024 times the previous
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB')
+
+# Console labels for optimization severities
+SEVERITY_MARKERS = {
+    'high': '🔴 HIGH',
+    'medium': '🟡 MEDIUM',
+    'low': '🟢 LOW'
+}
+
 
 # Data model
 class MediaItem(TypedDict):
@@ -124,27 +207,121 @@ def setup_logging(verbose: bool = False) -> None:
     )
 
 
-def get_slide_title(slide) -> str | None:
+def iter_shapes(shapes):
+    """
+    Iterate over shapes, descending into group shapes.
+
+    Args:
+        shapes: A shape collection from python-pptx (slide, layout, master or group)
+
+    Yields:
+        Each non-group shape, including those nested inside groups
+    """
+    from pptx.shapes.group import GroupShape
+
+    for shape in shapes:
+        if isinstance(shape, GroupShape):
+            yield from iter_shapes(shape.shapes)
+        else:
+            yield shape
+
+
+def get_image_part(shape):
     """
-    Extract the title from a slide.
+    Get the image part backing a picture shape.
 
     Args:
-        slide: A slide object from python-pptx
+        shape: A picture shape from python-pptx
 
     Returns:
-        The slide title text, or None if no title found
+        The ImagePart holding the picture's image bytes
+
+    Raises:
+        ValueError: If the picture has no embedded image
     """
-    if not slide.shapes.title:
-        return None
+    rId = shape._element.blip_rId
+    if rId is None:
+        raise ValueError("no embedded image")
+    return shape.part.related_part(rId)
 
-    try:
-        title_text = slide.shapes.title.text.strip()
-        return title_text if title_text else None
-    except (AttributeError, IndexError):
-        return None
 
+def sniff_image_header(image_blob: bytes) -> tuple[int, int, str] | None:
+    """
+    Read pixel size and format from a PNG or JPEG header without Pillow.
+
+    Only the first few segments of the blob are touched, regardless of image size.
+
+    Args:
+        image_blob: The raw image bytes
 
-def get_image_dimensions(image_blob: bytes, shape) -> ImageDimensions:
+    Returns:
+        Tuple of (width, height, format) using Pillow format names ('PNG', 'JPEG'),
+        or None if the format is not recognized or the header is malformed
+    """
+    if image_blob[:8] == PNG_SIGNATURE and image_blob[12:16] == b'IHDR':
+        if len(image_blob) < 24:  # Truncated IHDR
+            return None
+        width, height = struct.unpack('>II', image_blob[16:24])
+        return width, height, 'PNG'
+
+    if image_blob[:3] == b'\xff\xd8\xff':
+        offset = 2
+        blob_len = len(image_blob)
+        while offset + 4 <= blob_len:
+            if image_blob[offset] != 0xFF:
+                return None
+            marker = image_blob[offset + 1]
+            if marker == 0xFF:  # Fill byte before a marker
+                offset += 1
+                continue
+            if marker == 0xD8 or 0xD0 <= marker <= 0xD7:  # Markers without a payload
+                offset += 2
+                continue
+            segment_len = struct.unpack('>H', image_blob[offset + 2:offset + 4])[0]
+            if marker in JPEG_SOF_MARKERS:
+                if offset + 9 > blob_len:
+                    return None
+                height, width = struct.unpack('>HH', image_blob[offset + 5:offset + 9])
+                return width, height, 'JPEG'
+            if marker == 0xDA:  # Start of scan before any frame header
+                return None
+            offset += 2 + segment_len
+
+    return None
+
+
+def slide_extent(shape) -> tuple[float, float]:
+    """
+    Size of a shape as shown on the slide, in EMUs.
+
+    A shape inside a group is sized in the group's child coordinate space;
+    each enclosing group scales it by the ratio of its extent (a:ext) to its
+    child extent (a:chExt).
+
+    Args:
+        shape: A shape object from python-pptx
+
+    Returns:
+        Tuple of (width, height) in EMUs
+    """
+    width, height = shape.width, shape.height
+    for group in shape._element.iterancestors(P_GRPSP_TAG):
+        xfrm = group.find('p:grpSpPr/a:xfrm', NAMESPACES)
+        if xfrm is None:
+            continue
+        ext = xfrm.find('a:ext', NAMESPACES)
+        ch_ext = xfrm.find('a:chExt', NAMESPACES)
+        if ext is None or ch_ext is None:
+            continue
+        ch_cx, ch_cy = int(ch_ext.get('cx')), int(ch_ext.get('cy'))
+        if ch_cx > 0:
+            width = width * int(ext.get('cx')) / ch_cx
+        if ch_cy > 0:
+            height = height * int(ext.get('cy')) / ch_cy
+    return width, height
+
+
+def get_image_dimensions(image_blob: bytes, shape) -> tuple[ImageDimensions, str | None]:
     """
     Extract pixel and display dimensions for an image.
 
@@ -153,16 +330,26 @@ def get_image_dimensions(image_blob: bytes, shape) -> ImageDimensions:
         shape: The shape object from python-pptx
 
     Returns:
-        ImageDimensions with pixel and display information
+        Tuple of (ImageDimensions with pixel and display information,
+        format name such as 'PNG' or 'JPEG', or None if unknown)
     """
-    # Get pixel dimensions using Pillow
-    img = Image.open(io.BytesIO(image_blob))
-    pixel_width, pixel_height = img.size
+    # Get pixel dimensions and format from the PNG/JPEG header; fall back to
+    # Pillow (header only, no pixel decode) for other formats
+    header = sniff_image_header(image_blob)
+    if header:
+        pixel_width, pixel_height, img_format = header
+    else:
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(image_blob))
+        pixel_width, pixel_height = img.size
+        img_format = img.format
 
     # Convert shape dimensions from EMUs to pixels (assuming 96 DPI)
     # 1 inch = 914400 EMUs, 96 DPI means 96 pixels per inch
-    display_width_px = int(shape.width / 914400 * 96)
-    display_height_px = int(shape.height / 914400 * 96)
+    width_emu, height_emu = slide_extent(shape)
+    display_width_px = int(width_emu / 914400 * 96)
+    display_height_px = int(height_emu / 914400 * 96)
 
     # Calculate resolution ratio (how much larger the image is than display)
     if display_width_px > 0 and display_height_px > 0:
@@ -172,19 +359,21 @@ def get_image_dimensions(image_blob: bytes, shape) -> ImageDimensions:
     else:
         resolution_ratio = 1.0
 
-    return ImageDimensions(
+    dimensions = ImageDimensions(
         pixel_width=pixel_width,
         pixel_height=pixel_height,
         display_width_px=display_width_px,
         display_height_px=display_height_px,
         resolution_ratio=resolution_ratio
     )
+    return dimensions, img_format
 
 
 def analyze_image_optimization(
     image_blob: bytes,
     content_type: str,
     dimensions: ImageDimensions,
+    img_format: str | None,
     slide_index: int,
     slide_title: str | None,
     is_shared: bool
@@ -201,6 +390,7 @@ def analyze_image_optimization(
         image_blob: Raw image bytes
         content_type: MIME type (e.g., 'image/jpeg')
         dimensions: Image dimensions info
+        img_format: Pillow format name (e.g., 'PNG'), as returned by get_image_dimensions
         slide_index: Slide number (1-based)
         slide_title: Slide title or None
         is_shared: Whether image is shared across slides
@@ -210,21 +400,28 @@ def analyze_image_optimization(
     """
     opportunities = []
     current_bytes = len(image_blob)
-    img = Image.open(io.BytesIO(image_blob))
-    img_format = img.format
 
-    current_dim_str = f"{dimensions['pixel_width']}x{dimensions['pixel_height']}"
-    display_dim_str = f"{dimensions['display_width_px']}x{dimensions['display_height_px']}"
+    pixel_width = dimensions['pixel_width']
+    pixel_height = dimensions['pixel_height']
+    display_width_px = dimensions['display_width_px']
+    display_height_px = dimensions['display_height_px']
+    resolution_ratio = dimensions['resolution_ratio']
+
+    total_pixels = pixel_width * pixel_height
+    current_dim_str = f"{pixel_width}x{pixel_height}"
+    display_dim_str = f"{display_width_px}x{display_height_px}"
+    current_format = img_format or content_type
 
     # 1. Check for oversized resolution (>2.5x display size)
     # This is the most common and impactful issue
-    if dimensions['resolution_ratio'] > 2.5:
+    oversized_added = False
+    if resolution_ratio > 2.5:
         # Recommend 2x for retina quality
-        recommended_width = dimensions['display_width_px'] * 2
-        recommended_height = dimensions['display_height_px'] * 2
+        recommended_width = display_width_px * 2
+        recommended_height = display_height_px * 2
 
         # Maintain aspect ratio
-        aspect_ratio = dimensions['pixel_width'] / dimensions['pixel_height']
+        aspect_ratio = pixel_width / pixel_height
         if recommended_width / recommended_height > aspect_ratio:
             recommended_width = int(recommended_height * aspect_ratio)
         else:
@@ -233,13 +430,11 @@ def analyze_image_optimization(
         recommended_dim_str = f"{recommended_width}x{recommended_height}"
 
         # Estimate savings: proportional to pixel reduction
-        pixel_reduction = (recommended_width * recommended_height) / (
-            dimensions['pixel_width'] * dimensions['pixel_height']
-        )
+        pixel_reduction = (recommended_width * recommended_height) / total_pixels
         potential_bytes = int(current_bytes * pixel_reduction)
         savings_bytes = current_bytes - potential_bytes
 
-        severity = "high" if dimensions['resolution_ratio'] > 5 else "medium"
+        severity = "high" if resolution_ratio > 5 else "medium"
 
         opportunities.append(OptimizationOpportunity(
             slide_index=slide_index,
@@ -252,23 +447,25 @@ def analyze_image_optimization(
             current_dimensions=current_dim_str,
             display_dimensions=display_dim_str,
             recommended_dimensions=recommended_dim_str,
-            current_format=img_format or content_type,
-            recommended_format=img_format or content_type,
-            details=f"Image is {dimensions['resolution_ratio']:.1f}x larger than display size. "
+            current_format=current_format,
+            recommended_format=current_format,
+            details=f"Image is {resolution_ratio:.1f}x larger than display size. "
                    f"Resizing to 2x (retina quality) would maintain sharpness on all screens.",
             severity=severity,
             is_shared=is_shared
         ))
+        oversized_added = True
 
     # 2. Check for absolute size caps (>3200px on longest edge)
-    # Safety net for unreasonably large images
-    max_dimension = max(dimensions['pixel_width'], dimensions['pixel_height'])
-    if max_dimension > 3200:
+    # Safety net for unreasonably large images; only reported if not already
+    # caught by the oversized resolution check
+    max_dimension = max(pixel_width, pixel_height)
+    if max_dimension > 3200 and not oversized_added:
         # Recommend 2560px max (covers retina 1280px displays, suitable for conference projectors)
         target_max = 2560
-        aspect_ratio = dimensions['pixel_width'] / dimensions['pixel_height']
+        aspect_ratio = pixel_width / pixel_height
 
-        if dimensions['pixel_width'] > dimensions['pixel_height']:
+        if pixel_width > pixel_height:
             recommended_width = target_max
             recommended_height = int(target_max / aspect_ratio)
         else:
@@ -277,32 +474,28 @@ def analyze_image_optimization(
 
         recommended_dim_str = f"{recommended_width}x{recommended_height}"
 
-        pixel_reduction = (recommended_width * recommended_height) / (
-            dimensions['pixel_width'] * dimensions['pixel_height']
-        )
+        pixel_reduction = (recommended_width * recommended_height) / total_pixels
         potential_bytes = int(current_bytes * pixel_reduction)
         savings_bytes = current_bytes - potential_bytes
 
-        # Only add if not already caught by oversized resolution check
-        if not any(opp['opportunity_type'] == 'oversized_resolution' for opp in opportunities):
-            opportunities.append(OptimizationOpportunity(
-                slide_index=slide_index,
-                slide_title=slide_title,
-                opportunity_type="absolute_size",
-                current_bytes=current_bytes,
-                potential_bytes=potential_bytes,
-                savings_bytes=savings_bytes,
-                savings_percent=round((savings_bytes / current_bytes) * 100, 1),
-                current_dimensions=current_dim_str,
-                display_dimensions=display_dim_str,
-                recommended_dimensions=recommended_dim_str,
-                current_format=img_format or content_type,
-                recommended_format=img_format or content_type,
-                details=f"Image exceeds {max_dimension}px. Conference projectors rarely exceed "
-                       f"1920x1080 (Full HD). Recommend max {target_max}px for high-quality projection.",
-                severity="medium",
-                is_shared=is_shared
-            ))
+        opportunities.append(OptimizationOpportunity(
+            slide_index=slide_index,
+            slide_title=slide_title,
+            opportunity_type="absolute_size",
+            current_bytes=current_bytes,
+            potential_bytes=potential_bytes,
+            savings_bytes=savings_bytes,
+            savings_percent=round((savings_bytes / current_bytes) * 100, 1),
+            current_dimensions=current_dim_str,
+            display_dimensions=display_dim_str,
+            recommended_dimensions=recommended_dim_str,
+            current_format=current_format,
+            recommended_format=current_format,
+            details=f"Image exceeds {max_dimension}px. Conference projectors rarely exceed "
+                   f"1920x1080 (Full HD). Recommend max {target_max}px for high-quality projection.",
+            severity="medium",
+            is_shared=is_shared
+        ))
 
     # 3. Check for PNG photos (should be JPEG)
     # PNG is great for screenshots/diagrams, wasteful for photos
@@ -334,7 +527,7 @@ def analyze_image_optimization(
     # 4. Check for uncompressed/high-quality JPEG
     # JPEG with >1 byte/pixel suggests quality 95-100 (often unnecessary for presentations)
     if img_format == 'JPEG':
-        bytes_per_pixel = current_bytes / (dimensions['pixel_width'] * dimensions['pixel_height'])
+        bytes_per_pixel = current_bytes / total_pixels
         if bytes_per_pixel > 1.0:
             # Estimate re-saving at quality 85 (roughly 50% reduction)
             potential_bytes = int(current_bytes * 0.5)
@@ -363,6 +556,183 @@ def analyze_image_optimization(
     return opportunities
 
 
+def read_part_rels(zf: zipfile.ZipFile, partname: str, rel_type: str | None = None) -> dict[str, str]:
+    """
+    Read the internal relationships of a package part straight from the ZIP.
+
+    Args:
+        zf: The open .pptx package
+        partname: ZIP member name of the source part (e.g., 'ppt/slides/slide1.xml')
+        rel_type: If given, only relationships of this Type are returned
+
+    Returns:
+        Dict mapping relationship id to target ZIP member name. External targets
+        (linked files, hyperlinks) are omitted. Empty if the part has no rels.
+    """
+    part_dir, part_file = posixpath.split(partname)
+    rels_name = posixpath.join(part_dir, '_rels', part_file + '.rels')
+    try:
+        rels_xml = zf.read(rels_name)
+    except KeyError:
+        return {}
+
+    rels = {}
+    for rel in etree.fromstring(rels_xml).iterfind('rel:Relationship', NAMESPACES):
+        if rel.get('TargetMode') == 'External':
+            continue
+        if rel_type is not None and rel.get('Type') != rel_type:
+            continue
+        target = rel.get('Target')
+        if target.startswith('/'):
+            target_name = target[1:]
+        else:
+            target_name = posixpath.normpath(posixpath.join(part_dir, target))
+        rels[rel.get('Id')] = target_name
+    return rels
+
+
+def read_presentation_parts(zf: zipfile.ZipFile) -> tuple[list[str], list[str]]:
+    """
+    Locate the slide master and slide parts of a package, in presentation order.
+
+    Args:
+        zf: The open .pptx package
+
+    Returns:
+        Tuple of (master part names, slide part names)
+
+    Raises:
+        KeyError, StopIteration, XMLSyntaxError: If the package is malformed
+    """
+    package_rels = etree.fromstring(zf.read('_rels/.rels'))
+    pres_name = next(
+        rel.get('Target').lstrip('/')
+        for rel in package_rels.iterfind('rel:Relationship', NAMESPACES)
+        if rel.get('Type') == RT_OFFICE_DOCUMENT
+    )
+    pres_rels = read_part_rels(zf, pres_name)
+    pres = etree.fromstring(zf.read(pres_name))
+    master_names = [
+        pres_rels[el.get(RID_ATTR)]
+        for el in pres.iterfind('p:sldMasterIdLst/p:sldMasterId', NAMESPACES)
+    ]
+    slide_names = [
+        pres_rels[el.get(RID_ATTR)]
+        for el in pres.iterfind('p:sldIdLst/p:sldId', NAMESPACES)
+    ]
+    return master_names, slide_names
+
+
+def picture_sizes(part_xml, part_rels: dict[str, str], media_sizes: dict[str, int], part_label: str) -> list[int]:
+    """
+    Byte sizes of the pictures on a master or layout.
+
+    Args:
+        part_xml: Parsed root element of the master or layout part
+        part_rels: Relationships of the part, from read_part_rels
+        media_sizes: Uncompressed size of every ZIP member, by name
+        part_label: Description of the part for warnings (e.g., 'master 1')
+
+    Returns:
+        List of image sizes in bytes, one per picture shape
+    """
+    sizes = []
+    for rId in PICTURE_BLIP_RIDS_XPATH(part_xml):
+        target_name = part_rels.get(rId)
+        if target_name in media_sizes:
+            sizes.append(media_sizes[target_name])
+        else:
+            logging.warning(f"Failed to extract image from {part_label}: no image part for {rId}")
+    return sizes
+
+
+def read_content_types(zf: zipfile.ZipFile) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Read the package's [Content_Types].xml.
+
+    Args:
+        zf: The open .pptx package
+
+    Returns:
+        Tuple of (content type by lowercase extension, content type by ZIP member name)
+    """
+    types_xml = etree.fromstring(zf.read('[Content_Types].xml'))
+    defaults = {}
+    overrides = {}
+    for entry in types_xml:
+        if entry.tag == CT_DEFAULT_TAG:
+            defaults[entry.get('Extension').lower()] = entry.get('ContentType')
+        elif entry.tag == CT_OVERRIDE_TAG:
+            overrides[entry.get('PartName').lstrip('/')] = entry.get('ContentType')
+    return defaults, overrides
+
+
+def part_content_type(content_types: tuple[dict[str, str], dict[str, str]], partname: str) -> str:
+    """Content type of a package part: its Override, else the Default for its extension."""
+    defaults, overrides = content_types
+    if partname in overrides:
+        return overrides[partname]
+    return defaults.get(posixpath.splitext(partname)[1][1:].lower(), 'application/octet-stream')
+
+
+def iter_picture_elements(container, in_group: bool = False):
+    """
+    Iterate over the p:pic elements of a slide in document order, descending into groups.
+
+    Mirrors which shapes python-pptx reports as pictures or movies: placeholders
+    on the slide itself (e.g. a filled picture placeholder) are skipped.
+
+    Args:
+        container: A parsed slide root or p:grpSp element
+        in_group: True when container is a p:grpSp reached by recursion; pictures
+            inside groups are yielded even if they carry a p:ph, as in python-pptx
+
+    Yields:
+        Each p:pic element
+    """
+    if not in_group:
+        container = container.find('p:cSld/p:spTree', NAMESPACES)
+    for child in container:
+        if child.tag == P_PIC_TAG:
+            if in_group or child.find('p:nvPicPr/p:nvPr/p:ph', NAMESPACES) is None:
+                yield child
+        elif child.tag == P_GRPSP_TAG:
+            yield from iter_picture_elements(child, in_group=True)
+
+
+def read_slide_title(slide_xml) -> str | None:
+    """
+    Extract the title from parsed slide XML, as python-pptx's shapes.title would.
+
+    Used by both the ZIP-based media pass and the python-pptx optimization pass
+    (via slide._element), so titles match between the two reports.
+
+    Args:
+        slide_xml: Parsed root element of a slide part
+
+    Returns:
+        The slide title text, or None if no title found
+    """
+    for shape in slide_xml.iterfind('p:cSld/p:spTree/*', NAMESPACES):
+        ph = shape.find('*/p:nvPr/p:ph', NAMESPACES)
+        if ph is None or ph.get('idx', '0') != '0':
+            continue
+        if shape.tag != P_SP_TAG:
+            return None  # e.g. a table or chart title placeholder has no text
+
+        # Paragraphs are joined by newlines; soft line breaks read as vertical tabs
+        paragraphs = []
+        for paragraph in shape.iterfind('p:txBody/a:p', NAMESPACES):
+            paragraphs.append(''.join(
+                '\v' if el.tag == A_BR_TAG else el.findtext('a:t', '', NAMESPACES)
+                for el in paragraph
+                if el.tag in TEXT_RUN_TAGS
+            ))
+        title_text = '\n'.join(paragraphs).strip()
+        return title_text if title_text else None
+    return None
+
+
 def analyze_pptx_media(path: str, include_shared_media: bool = False) -> list[SlideMediaStats]:
     """
     Analyze a PowerPoint file to determine media size per slide.
@@ -387,191 +757,203 @@ def analyze_pptx_media(path: str, include_shared_media: bool = False) -> list[Sl
     if file_path.suffix.lower() != '.pptx':
         raise ValueError(f"unsupported file type (expected .pptx): {path}")
 
-    # Try to open the presentation
-    try:
-        prs = Presentation(path)
-    except Exception as e:
-        raise ValueError(f"failed to open .pptx: {e}")
+    return analyze_pptx_media_from_stream(path, include_shared_media)
 
-    logging.info(f"Found {len(prs.slides)} slides")
 
-    # Track all media across slides to detect sharing
-    media_registry = {}  # key: image blob hash or media part name -> value: {size, slides, first_slide}
-    slide_media_map = defaultdict(list)  # slide_index -> list of media items
+def analyze_pptx_media_from_stream(
+    source: str | IO[bytes], include_shared_media: bool = False
+) -> list[SlideMediaStats]:
+    """
+    Analyze an already-located .pptx package to determine media size per slide.
 
-    # First pass: collect all media and track where it appears
-    for slide_idx, slide in enumerate(prs.slides, start=1):
-        logging.debug(f"Analyzing slide {slide_idx}")
+    Same as analyze_pptx_media, without the path and extension checks, so an
+    in-memory deck (e.g. a BytesIO written by Presentation.save) can be analyzed.
 
-        for shape in slide.shapes:
-            # Handle images
-            if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                try:
-                    image = shape.image
-                    blob = image.blob
-                    size_bytes = len(blob)
-                    content_type = image.content_type
+    Args:
+        source: Path to the package or a seekable binary file object
+        include_shared_media: If True, count shared media on every slide.
+                             If False (default), count shared media only on first appearance.
 
-                    # Use blob hash as identifier for detecting duplicates
-                    media_key = hash(blob)
+    Returns:
+        List of SlideMediaStats, one per slide, sorted by total_media_bytes descending
 
-                    if media_key not in media_registry:
-                        media_registry[media_key] = {
-                            'size': size_bytes,
-                            'type': 'image',
+    Raises:
+        ValueError: If the package is corrupt
+    """
+    # Open the package; slide XML is parsed directly and media sizes come from
+    # the ZIP directory, so media blobs are never decompressed
+    try:
+        zf = zipfile.ZipFile(source)
+    except Exception as e:
+        raise ValueError(f"failed to open .pptx: {e}")
+
+    with zf:
+        try:
+            _, slide_names = read_presentation_parts(zf)
+            content_types = read_content_types(zf)
+        except Exception as e:
+            raise ValueError(f"failed to open .pptx: {e}")
+        media_sizes = {info.filename: info.file_size for info in zf.infolist()}
+
+        logging.info(f"Found {len(slide_names)} slides")
+
+        # Track all media across slides to detect sharing
+        media_registry = {}  # key: media part name -> value: {size, slides, first_slide, items}
+        results = []
+
+        # Single pass: collect media, track where it appears, and build SlideMediaStats
+        for slide_idx, slide_name in enumerate(slide_names, start=1):
+            logging.debug(f"Analyzing slide {slide_idx}")
+            slide_xml = etree.fromstring(zf.read(slide_name))
+            slide_rels = read_part_rels(zf, slide_name)
+            title = read_slide_title(slide_xml)
+            slide_refs = []  # media references found on this slide
+
+            for pic in iter_picture_elements(slide_xml):
+                # Audio/video shapes are p:pic with an a:videoFile or a:audioFile;
+                # other pictures are images, found through their blip
+                is_media = IS_MEDIA_PIC_XPATH(pic)
+                try:
+                    if is_media:
+                        media_rids = MEDIA_RID_XPATH(pic)
+                        if not media_rids:
+                            raise ValueError("no media relationship found")
+                    else:
+                        media_rids = pic.xpath('p:blipFill/a:blip/@r:embed', namespaces=NAMESPACES)
+                        if not media_rids:
+                            raise ValueError("no embedded image")
+
+                    # Use part name as identifier: python-pptx and PowerPoint store
+                    # identical media once, so shared media share a part
+                    media_key = slide_rels.get(media_rids[0])
+                    if media_key not in media_sizes:
+                        raise KeyError(f"no relationship with key '{media_rids[0]}'")
+
+                    media_info = media_registry.get(media_key)
+                    if media_info is None:
+                        content_type = part_content_type(content_types, media_key)
+                        if is_media:
+                            major_type = content_type.split('/', 1)[0].lower()
+                            media_type = MEDIA_TYPE_BY_MAJOR_TYPE.get(major_type, 'other')
+                        else:
+                            media_type = 'image'
+
+                        media_info = media_registry[media_key] = {
+                            'size': media_sizes[media_key],
+                            'type': media_type,
                             'content_type': content_type,
-                            'filename': image.filename if hasattr(image, 'filename') else None,
+                            'filename': posixpath.basename(media_key),
                             'slides': [],
-                            'first_slide': slide_idx
+                            'first_slide': slide_idx,
+                            'items': []  # MediaItems referencing this media
                         }
 
-                    media_registry[media_key]['slides'].append(slide_idx)
+                    # Slides are visited in order, so comparing with the last entry
+                    # keeps the list distinct when media repeats on one slide
+                    slides = media_info['slides']
+                    if not slides or slides[-1] != slide_idx:
+                        slides.append(slide_idx)
 
                     # Store reference for this slide
-                    slide_media_map[slide_idx].append({
-                        'media_key': media_key,
-                        'type': 'image',
-                        'size_bytes': size_bytes,
-                        'content_type': content_type,
-                        'filename': media_registry[media_key]['filename']
+                    slide_refs.append({
+                        'media_info': media_info,
+                        'type': media_info['type'],
+                        'size_bytes': media_info['size'],
+                        'content_type': media_info['content_type'],
+                        'filename': media_info['filename']
                     })
 
-                    logging.debug(f"  Found image: {size_bytes} bytes, type={content_type}")
-
-                except Exception as e:
-                    logging.warning(f"  Failed to extract image from slide {slide_idx}: {e}")
-
-            # Handle video and audio
-            elif hasattr(shape, 'shape_type') and shape.shape_type == MSO_SHAPE_TYPE.MEDIA:
-                try:
-                    media_format = shape.media_format
-                    if media_format:
-                        # Get the media part
-                        media_part = shape.part.related_part(shape._element.xpath('.//a:videoFile | .//a:audioFile | .//p:media')[0].get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed'))
-
-                        size_bytes = len(media_part.blob)
-                        content_type = media_part.content_type
-
-                        # Determine media type
-                        if 'video' in content_type.lower():
-                            media_type = 'video'
-                        elif 'audio' in content_type.lower():
-                            media_type = 'audio'
-                        else:
-                            media_type = 'other'
-
-                        # Use part name as identifier
-                        media_key = media_part.partname
-
-                        if media_key not in media_registry:
-                            media_registry[media_key] = {
-                                'size': size_bytes,
-                                'type': media_type,
-                                'content_type': content_type,
-                                'filename': Path(media_part.partname).name,
-                                'slides': [],
-                                'first_slide': slide_idx
-                            }
-
-                        media_registry[media_key]['slides'].append(slide_idx)
-
-                        slide_media_map[slide_idx].append({
-                            'media_key': media_key,
-                            'type': media_type,
-                            'size_bytes': size_bytes,
-                            'content_type': content_type,
-                            'filename': media_registry[media_key]['filename']
-                        })
-
-                        logging.debug(f"  Found {media_type}: {size_bytes} bytes, type={content_type}")
+                    logging.debug(
+                        f"  Found {media_info['type']}: {media_info['size']} bytes, "
+                        f"type={media_info['content_type']}"
+                    )
 
                 except Exception as e:
-                    logging.warning(f"  Failed to extract media from slide {slide_idx}: {e}")
+                    kind = "media" if is_media else "image"
+                    logging.warning(f"  Failed to extract {kind} from slide {slide_idx}: {e}")
+
+            media_items = []
+
+            image_bytes = 0
+            video_bytes = 0
+            audio_bytes = 0
+            other_media_bytes = 0
+
+            # Process media for this slide
+            for media_ref in slide_refs:
+                media_info = media_ref['media_info']
+                is_first_appearance = media_info['first_slide'] == slide_idx
+
+                # Determine if we should count the bytes. Any later appearance means the
+                # media is on more than one slide, i.e. shared.
+                if include_shared_media or is_first_appearance:
+                    count_bytes = media_ref['size_bytes']
+                else:
+                    count_bytes = 0  # Shared media, not first appearance, don't count
+
+                # Create media item
+                media_item: MediaItem = {
+                    'type': media_ref['type'],
+                    'size_bytes': count_bytes,
+                    'filename': media_ref['filename'],
+                    'content_type': media_ref['content_type'],
+                    'relationship_id': None,  # Could be enhanced later
+                    'shared': False  # Set below once all slides are scanned
+                }
+                media_items.append(media_item)
+                media_info['items'].append(media_item)
+
+                # Accumulate by type
+                if media_ref['type'] == 'image':
+                    image_bytes += count_bytes
+                elif media_ref['type'] == 'video':
+                    video_bytes += count_bytes
+                elif media_ref['type'] == 'audio':
+                    audio_bytes += count_bytes
+                else:
+                    other_media_bytes += count_bytes
+
+            total_media_bytes = image_bytes + video_bytes + audio_bytes + other_media_bytes
+
+            stats: SlideMediaStats = {
+                'slide_index': slide_idx,
+                'slide_title': title,
+                'total_media_bytes': total_media_bytes,
+                'image_bytes': image_bytes,
+                'video_bytes': video_bytes,
+                'audio_bytes': audio_bytes,
+                'other_media_bytes': other_media_bytes,
+                'media_items': media_items
+            }
+            results.append(stats)
 
-    # Mark shared media
+    # Mark shared media: one check per unique media, touching only shared items
     for media_key, info in media_registry.items():
         if len(info['slides']) > 1:
             logging.debug(f"Media {info.get('filename', media_key)} appears on slides: {info['slides']}")
-
-    # Second pass: build SlideMediaStats for each slide
-    results = []
-    for slide_idx, slide in enumerate(prs.slides, start=1):
-        title = get_slide_title(slide)
-        media_items = []
-
-        image_bytes = 0
-        video_bytes = 0
-        audio_bytes = 0
-        other_media_bytes = 0
-
-        # Process media for this slide
-        for media_ref in slide_media_map.get(slide_idx, []):
-            media_key = media_ref['media_key']
-            media_info = media_registry[media_key]
-
-            is_shared = len(media_info['slides']) > 1
-            is_first_appearance = media_info['first_slide'] == slide_idx
-
-            # Determine if we should count the bytes
-            if include_shared_media or not is_shared or is_first_appearance:
-                count_bytes = media_ref['size_bytes']
-            else:
-                count_bytes = 0  # Shared media, not first appearance, don't count
-
-            # Create media item
-            media_item: MediaItem = {
-                'type': media_ref['type'],
-                'size_bytes': count_bytes,
-                'filename': media_ref['filename'],
-                'content_type': media_ref['content_type'],
-                'relationship_id': None,  # Could be enhanced later
-                'shared': is_shared
-            }
-            media_items.append(media_item)
-
-            # Accumulate by type
-            if media_ref['type'] == 'image':
-                image_bytes += count_bytes
-            elif media_ref['type'] == 'video':
-                video_bytes += count_bytes
-            elif media_ref['type'] == 'audio':
-                audio_bytes += count_bytes
-            else:
-                other_media_bytes += count_bytes
-
-        total_media_bytes = image_bytes + video_bytes + audio_bytes + other_media_bytes
-
-        stats: SlideMediaStats = {
-            'slide_index': slide_idx,
-            'slide_title': title,
-            'total_media_bytes': total_media_bytes,
-            'image_bytes': image_bytes,
-            'video_bytes': video_bytes,
-            'audio_bytes': audio_bytes,
-            'other_media_bytes': other_media_bytes,
-            'media_items': media_items
-        }
-        results.append(stats)
+            for media_item in info['items']:
+                media_item['shared'] = True
 
     # Sort by total_media_bytes descending
-    results.sort(key=lambda x: x['total_media_bytes'], reverse=True)
+    results.sort(key=itemgetter('total_media_bytes'), reverse=True)
 
     return results
 
 
+# Report totals and shared media sizes repeat across lines, so results are cached
+@functools.lru_cache(maxsize=1024)
 def format_bytes(num_bytes: int) -> str:
     """Format bytes into human-readable string (KB, MB, GB)."""
     if num_bytes == 0:
         return "0.0 MB"
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
 
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if num_bytes < 1024.0 or unit == 'GB':
-            if unit == 'B':
-                return f"{num_bytes} {unit}"
-            return f"{num_bytes:.1f} {unit}"
-        num_bytes /= 1024.0
-
-    return f"{num_bytes:.1f} GB"
+    # Each unit is 2**10 times the previous, so bit_length picks the unit directly;
+    # int() lets floats and numpy integers through, and flooring keeps the
+    # 1024-boundaries unchanged
+    unit_idx = min((int(num_bytes).bit_length() - 1) // 10, len(BYTE_UNITS) - 1)
+    return f"{num_bytes / (1 << (unit_idx * 10)):.1f} {BYTE_UNITS[unit_idx]}"
 
 
 def print_console_output(results: list[SlideMediaStats], filename: str, top_n: int | None = None) -> None:
@@ -645,8 +1027,8 @@ def write_csv_output(results: list[SlideMediaStats], output_path: str) -> None:
             ])
 
             # Data rows
-            for rank, stats in enumerate(results, start=1):
-                writer.writerow([
+            writer.writerows(
+                (
                     rank,
                     stats['slide_index'],
                     stats['slide_title'] or '',
@@ -655,7 +1037,9 @@ def write_csv_output(results: list[SlideMediaStats], output_path: str) -> None:
                     stats['video_bytes'],
                     stats['audio_bytes'],
                     stats['other_media_bytes']
-                ])
+                )
+                for rank, stats in enumerate(results, start=1)
+            )
 
         logging.info(f"CSV output written to: {output_path}")
     except Exception as e:
@@ -684,6 +1068,9 @@ def analyze_optimization_opportunities(path: str) -> list[OptimizationOpportunit
     if file_path.suffix.lower() != '.pptx':
         raise ValueError(f"unsupported file type (expected .pptx): {path}")
 
+    from pptx import Presentation
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+
     # Open presentation
     try:
         prs = Presentation(path)
@@ -693,30 +1080,37 @@ def analyze_optimization_opportunities(path: str) -> list[OptimizationOpportunit
     logging.info(f"Analyzing {len(prs.slides)} slides for optimization opportunities")
 
     # Track shared media
-    media_registry = {}  # key: image blob hash -> value: {size, slides, first_slide}
-    slide_shapes_map = {}  # slide_index -> list of (shape, media_key)
+    media_registry = {}  # key: image part name -> value: {blob, slides, first_slide}
+    # (slide_index, slide_title, shape, media_key) for each image's first appearance
+    first_appearances = []
 
-    # First pass: collect all images and detect sharing
+    # First pass: collect all images, detect sharing, and read each slide title once
     for slide_idx, slide in enumerate(prs.slides, start=1):
-        slide_shapes_map[slide_idx] = []
+        # Text-only slides have no p:pic; skip them before building shape objects
+        if not SLIDE_HAS_PICTURE_XPATH(slide._element):
+            continue
+        slide_title = read_slide_title(slide._element)
 
-        for shape in slide.shapes:
-            if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+        for shape in iter_shapes(slide.shapes):
+            if shape._element.tag == P_PIC_TAG and shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
                 try:
-                    image = shape.image
-                    blob = image.blob
-                    media_key = hash(blob)
+                    image_part = get_image_part(shape)
+                    media_key = image_part.partname
 
                     if media_key not in media_registry:
                         media_registry[media_key] = {
-                            'blob': blob,
-                            'content_type': image.content_type,
+                            'blob': image_part.blob,
+                            'content_type': image_part.content_type,
                             'slides': [],
                             'first_slide': slide_idx
                         }
+                        # Only analyze each unique image once (on first appearance)
+                        first_appearances.append((slide_idx, slide_title, shape, media_key))
 
-                    media_registry[media_key]['slides'].append(slide_idx)
-                    slide_shapes_map[slide_idx].append((shape, media_key))
+                    # Record each slide once, even if the image repeats on it
+                    slides = media_registry[media_key]['slides']
+                    if not slides or slides[-1] != slide_idx:
+                        slides.append(slide_idx)
 
                 except Exception as e:
                     logging.warning(f"Failed to analyze image on slide {slide_idx}: {e}")
@@ -724,39 +1118,32 @@ def analyze_optimization_opportunities(path: str) -> list[OptimizationOpportunit
     # Second pass: analyze each unique image for optimization opportunities
     all_opportunities = []
 
-    for slide_idx, slide in enumerate(prs.slides, start=1):
-        slide_title = get_slide_title(slide)
-
-        for shape, media_key in slide_shapes_map.get(slide_idx, []):
-            media_info = media_registry[media_key]
-            is_shared = len(media_info['slides']) > 1
-            is_first_appearance = media_info['first_slide'] == slide_idx
+    for slide_idx, slide_title, shape, media_key in first_appearances:
+        media_info = media_registry[media_key]
+        is_shared = len(media_info['slides']) > 1
 
-            # Only analyze each unique image once (on first appearance)
-            if not is_first_appearance:
-                continue
-
-            try:
-                # Get image dimensions
-                dimensions = get_image_dimensions(media_info['blob'], shape)
-
-                # Analyze for optimization opportunities
-                opportunities = analyze_image_optimization(
-                    image_blob=media_info['blob'],
-                    content_type=media_info['content_type'],
-                    dimensions=dimensions,
-                    slide_index=slide_idx,
-                    slide_title=slide_title,
-                    is_shared=is_shared
-                )
+        try:
+            # Get image dimensions
+            dimensions, img_format = get_image_dimensions(media_info['blob'], shape)
+
+            # Analyze for optimization opportunities
+            opportunities = analyze_image_optimization(
+                image_blob=media_info['blob'],
+                content_type=media_info['content_type'],
+                dimensions=dimensions,
+                img_format=img_format,
+                slide_index=slide_idx,
+                slide_title=slide_title,
+                is_shared=is_shared
+            )
 
-                all_opportunities.extend(opportunities)
+            all_opportunities.extend(opportunities)
 
-            except Exception as e:
-                logging.warning(f"Failed to analyze optimization for slide {slide_idx}: {e}")
+        except Exception as e:
+            logging.warning(f"Failed to analyze optimization for slide {slide_idx}: {e}")
 
     # Sort by potential savings (highest first)
-    all_opportunities.sort(key=lambda x: x['savings_bytes'], reverse=True)
+    all_opportunities.sort(key=itemgetter('savings_bytes'), reverse=True)
 
     return all_opportunities
 
@@ -774,6 +1161,9 @@ def print_optimization_report(opportunities: list[OptimizationOpportunity], file
         print("\nNo optimization opportunities found. Your images are well-optimized!")
         return
 
+    # Build the report in memory and write it to stdout in one call
+    out = io.StringIO()
+
     # Calculate total potential savings
     total_savings = sum(opp['savings_bytes'] for opp in opportunities)
     total_current = sum(opp['current_bytes'] for opp in opportunities)
@@ -784,53 +1174,54 @@ def print_optimization_report(opportunities: list[OptimizationOpportunity], file
     medium_severity = [opp for opp in opportunities if opp['severity'] == 'medium']
     low_severity = [opp for opp in opportunities if opp['severity'] == 'low']
 
-    print(f"\n{'='*80}")
-    print(f"OPTIMIZATION REPORT: {filename}")
-    print(f"{'='*80}")
-    print(f"\nSUMMARY:")
-    print(f"  Total opportunities found: {len(opportunities)}")
-    print(f"  Potential savings: {format_bytes(total_savings)} ({total_savings_pct:.1f}% reduction)")
-    print(f"  High priority: {len(high_severity)} | Medium: {len(medium_severity)} | Low: {len(low_severity)}")
+    print(f"\n{'='*80}", file=out)
+    print(f"OPTIMIZATION REPORT: {filename}", file=out)
+    print(f"{'='*80}", file=out)
+    print(f"\nSUMMARY:", file=out)
+    print(f"  Total opportunities found: {len(opportunities)}", file=out)
+    print(f"  Potential savings: {format_bytes(total_savings)} ({total_savings_pct:.1f}% reduction)", file=out)
+    print(f"  High priority: {len(high_severity)} | Medium: {len(medium_severity)} | Low: {len(low_severity)}", file=out)
 
-    print(f"\n{'='*80}")
-    print(f"RECOMMENDATIONS (sorted by potential savings):")
-    print(f"{'='*80}\n")
+    print(f"\n{'='*80}", file=out)
+    print(f"RECOMMENDATIONS (sorted by potential savings):", file=out)
+    print(f"{'='*80}\n", file=out)
 
     for idx, opp in enumerate(opportunities, start=1):
-        severity_marker = {
-            'high': '🔴 HIGH',
-            'medium': '🟡 MEDIUM',
-            'low': '🟢 LOW'
-        }.get(opp['severity'], opp['severity'])
-
-        print(f"#{idx} - Slide {opp['slide_index']}: {opp['slide_title'] or '(no title)'}")
-        print(f"    Priority: {severity_marker}")
-        print(f"    Current: {format_bytes(opp['current_bytes'])} | {opp['current_format']} | {opp['current_dimensions']}")
-        print(f"    Display size: {opp['display_dimensions']} pixels")
-        print(f"    Recommended: {opp['recommended_format']} | {opp['recommended_dimensions']}")
-        print(f"    Potential savings: {format_bytes(opp['savings_bytes'])} ({opp['savings_percent']}%)")
+        severity_marker = SEVERITY_MARKERS.get(opp['severity'], opp['severity'])
+
+        print(f"#{idx} - Slide {opp['slide_index']}: {opp['slide_title'] or '(no title)'}", file=out)
+        print(f"    Priority: {severity_marker}", file=out)
+        print(f"    Current: {format_bytes(opp['current_bytes'])} | {opp['current_format']} | {opp['current_dimensions']}", file=out)
+        print(f"    Display size: {opp['display_dimensions']} pixels", file=out)
+        print(f"    Recommended: {opp['recommended_format']} | {opp['recommended_dimensions']}", file=out)
+        print(f"    Potential savings: {format_bytes(opp['savings_bytes'])} ({opp['savings_percent']}%)", file=out)
 
         if opp['is_shared']:
-            print(f"    ⚠️  SHARED: This image appears on multiple slides - optimization affects all")
-
-        print(f"    💡 {opp['details']}")
-        print()
-
-    print(f"{'='*80}")
-    print(f"NOTES FOR CONFERENCE PRESENTATIONS:")
-    print(f"{'='*80}")
-    print(f"  • Most conference projectors are 1920x1080 (Full HD)")
-    print(f"  • 2x resolution (e.g., 1536x864 for 768x432 display) ensures retina quality")
-    print(f"  • Images larger than 2560px rarely improve visual quality on projectors")
-    print(f"  • JPEG quality 85-90 is visually identical to quality 95-100 when projected")
-    print(f"  • PNG is best for screenshots/diagrams; JPEG is best for photos")
-    print()
+            print(f"    ⚠️  SHARED: This image appears on multiple slides - optimization affects all", file=out)
+
+        print(f"    💡 {opp['details']}", file=out)
+        print(file=out)
+
+    print(f"{'='*80}", file=out)
+    print(f"NOTES FOR CONFERENCE PRESENTATIONS:", file=out)
+    print(f"{'='*80}", file=out)
+    print(f"  • Most conference projectors are 1920x1080 (Full HD)", file=out)
+    print(f"  • 2x resolution (e.g., 1536x864 for 768x432 display) ensures retina quality", file=out)
+    print(f"  • Images larger than 2560px rarely improve visual quality on projectors", file=out)
+    print(f"  • JPEG quality 85-90 is visually identical to quality 95-100 when projected", file=out)
+    print(f"  • PNG is best for screenshots/diagrams; JPEG is best for photos", file=out)
+    print(file=out)
+    sys.stdout.write(out.getvalue())
 
 
 def analyze_slide_masters(path: str) -> MastersReport:
     """
     Analyze slide masters and layouts for media content and usage.
 
+    Reads the package directly: only the presentation, master and layout XML
+    plus slide relationships are parsed, and media sizes come from the ZIP
+    directory, so slide content and media are never loaded into memory.
+
     Args:
         path: Path to the .pptx file
 
@@ -849,131 +1240,127 @@ def analyze_slide_masters(path: str) -> MastersReport:
     if file_path.suffix.lower() != '.pptx':
         raise ValueError(f"unsupported file type (expected .pptx): {path}")
 
-    # Open presentation
+    # Open the package and locate the masters and slides, in presentation order
     try:
-        prs = Presentation(path)
+        zf = zipfile.ZipFile(path)
     except Exception as e:
         raise ValueError(f"failed to open .pptx: {e}")
 
-    logging.info(f"Analyzing {len(prs.slide_masters)} slide masters")
-
-    # Build a map of which layouts are used by which slides
-    layout_usage = {}  # layout id -> list of slide indices
-    for slide_idx, slide in enumerate(prs.slides, start=1):
-        layout_id = id(slide.slide_layout)
-        if layout_id not in layout_usage:
-            layout_usage[layout_id] = []
-        layout_usage[layout_id].append(slide_idx)
-
-    masters_stats = []
-    total_master_media = 0
-    total_layout_media = 0
-    total_unused_layout_media = 0
-    total_layouts = 0
-    unused_layouts = 0
-
-    # Analyze each slide master
-    for master_idx, master in enumerate(prs.slide_masters, start=1):
-        # Get master name
-        master_name = None
+    with zf:
         try:
-            # Try to get theme name or other identifier
-            if hasattr(master, 'name') and master.name:
-                master_name = master.name
-        except Exception:
-            pass
-
-        # Analyze media directly on the master
-        master_image_bytes = 0
-        master_video_bytes = 0
-        master_audio_bytes = 0
-        master_other_bytes = 0
-        master_media_count = 0
-
-        for shape in master.shapes:
-            if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                try:
-                    blob = shape.image.blob
-                    master_image_bytes += len(blob)
-                    master_media_count += 1
-                except Exception as e:
-                    logging.warning(f"Failed to extract image from master {master_idx}: {e}")
-
-        master_total = master_image_bytes + master_video_bytes + master_audio_bytes + master_other_bytes
-        total_master_media += master_total
-
-        # Analyze each layout in this master
-        layout_stats = []
-        master_layout_bytes = 0
-        master_unused_bytes = 0
-
-        for layout_idx, layout in enumerate(master.slide_layouts, start=1):
-            total_layouts += 1
-            layout_id = id(layout)
-            slides_using = layout_usage.get(layout_id, [])
-            is_used = len(slides_using) > 0
-
-            if not is_used:
-                unused_layouts += 1
-
-            # Get layout name
-            layout_name = layout.name if hasattr(layout, 'name') and layout.name else f"Layout {layout_idx}"
-
-            # Analyze media in this layout
-            layout_image_bytes = 0
-            layout_video_bytes = 0
-            layout_audio_bytes = 0
-            layout_other_bytes = 0
-            layout_media_count = 0
-
-            for shape in layout.shapes:
-                if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                    try:
-                        blob = shape.image.blob
-                        layout_image_bytes += len(blob)
-                        layout_media_count += 1
-                    except Exception as e:
-                        logging.warning(f"Failed to extract image from layout {layout_name}: {e}")
-
-            layout_total = layout_image_bytes + layout_video_bytes + layout_audio_bytes + layout_other_bytes
-            master_layout_bytes += layout_total
-            total_layout_media += layout_total
-
-            if not is_used:
-                master_unused_bytes += layout_total
-                total_unused_layout_media += layout_total
-
-            layout_stat: LayoutMediaStats = {
-                'layout_name': layout_name,
-                'layout_index': layout_idx,
-                'total_media_bytes': layout_total,
-                'image_bytes': layout_image_bytes,
-                'video_bytes': layout_video_bytes,
-                'audio_bytes': layout_audio_bytes,
-                'other_media_bytes': layout_other_bytes,
-                'media_count': layout_media_count,
-                'is_used': is_used,
-                'slides_using': slides_using
+            master_names, slide_names = read_presentation_parts(zf)
+        except Exception as e:
+            raise ValueError(f"failed to open .pptx: {e}")
+        media_sizes = {info.filename: info.file_size for info in zf.infolist()}
+
+        logging.info(f"Analyzing {len(master_names)} slide masters")
+
+        # Build a map of which layouts are used by which slides
+        layout_usage = defaultdict(list)  # layout part name -> list of slide indices
+        for slide_idx, slide_name in enumerate(slide_names, start=1):
+            for layout_name in read_part_rels(zf, slide_name, RT_SLIDE_LAYOUT).values():
+                layout_usage[layout_name].append(slide_idx)
+
+        masters_stats = []
+        total_master_media = 0
+        total_layout_media = 0
+        total_unused_layout_media = 0
+        total_layouts = 0
+        unused_layouts = 0
+
+        # Analyze each slide master
+        for master_idx, master_part in enumerate(master_names, start=1):
+            master_xml = etree.fromstring(zf.read(master_part))
+            master_rels = read_part_rels(zf, master_part)
+
+            # Get master name
+            master_name = master_xml.find('p:cSld', NAMESPACES).get('name') or None
+
+            # Analyze media directly on the master
+            master_image_bytes = 0
+            master_video_bytes = 0
+            master_audio_bytes = 0
+            master_other_bytes = 0
+            master_media_count = 0
+
+            image_sizes = picture_sizes(master_xml, master_rels, media_sizes, f"master {master_idx}")
+            master_image_bytes += sum(image_sizes)
+            master_media_count += len(image_sizes)
+
+            master_total = master_image_bytes + master_video_bytes + master_audio_bytes + master_other_bytes
+            total_master_media += master_total
+
+            # Analyze each layout in this master
+            layout_stats = []
+            master_layout_bytes = 0
+            master_unused_bytes = 0
+
+            layout_parts = [
+                master_rels[el.get(RID_ATTR)]
+                for el in master_xml.iterfind('p:sldLayoutIdLst/p:sldLayoutId', NAMESPACES)
+            ]
+            for layout_idx, layout_part in enumerate(layout_parts, start=1):
+                total_layouts += 1
+                layout_xml = etree.fromstring(zf.read(layout_part))
+                is_used = layout_part in layout_usage
+                slides_using = layout_usage[layout_part] if is_used else []
+
+                if not is_used:
+                    unused_layouts += 1
+
+                # Get layout name
+                layout_name = layout_xml.find('p:cSld', NAMESPACES).get('name') or f"Layout {layout_idx}"
+
+                # Analyze media in this layout
+                layout_image_bytes = 0
+                layout_video_bytes = 0
+                layout_audio_bytes = 0
+                layout_other_bytes = 0
+                layout_media_count = 0
+
+                image_sizes = picture_sizes(layout_xml, read_part_rels(zf, layout_part), media_sizes, f"layout {layout_name}")
+                layout_image_bytes += sum(image_sizes)
+                layout_media_count += len(image_sizes)
+
+                layout_total = layout_image_bytes + layout_video_bytes + layout_audio_bytes + layout_other_bytes
+                master_layout_bytes += layout_total
+                total_layout_media += layout_total
+
+                if not is_used:
+                    master_unused_bytes += layout_total
+                    total_unused_layout_media += layout_total
+
+                layout_stat: LayoutMediaStats = {
+                    'layout_name': layout_name,
+                    'layout_index': layout_idx,
+                    'total_media_bytes': layout_total,
+                    'image_bytes': layout_image_bytes,
+                    'video_bytes': layout_video_bytes,
+                    'audio_bytes': layout_audio_bytes,
+                    'other_media_bytes': layout_other_bytes,
+                    'media_count': layout_media_count,
+                    'is_used': is_used,
+                    'slides_using': slides_using
+                }
+                layout_stats.append(layout_stat)
+
+            master_stat: MasterMediaStats = {
+                'master_index': master_idx,
+                'master_name': master_name,
+                'total_media_bytes': master_total,
+                'image_bytes': master_image_bytes,
+                'video_bytes': master_video_bytes,
+                'audio_bytes': master_audio_bytes,
+                'other_media_bytes': master_other_bytes,
+                'media_count': master_media_count,
+                'layouts': layout_stats,
+                'total_layout_bytes': master_layout_bytes,
+                'unused_layout_bytes': master_unused_bytes
             }
-            layout_stats.append(layout_stat)
-
-        master_stat: MasterMediaStats = {
-            'master_index': master_idx,
-            'master_name': master_name,
-            'total_media_bytes': master_total,
-            'image_bytes': master_image_bytes,
-            'video_bytes': master_video_bytes,
-            'audio_bytes': master_audio_bytes,
-            'other_media_bytes': master_other_bytes,
-            'media_count': master_media_count,
-            'layouts': layout_stats,
-            'total_layout_bytes': master_layout_bytes,
-            'unused_layout_bytes': master_unused_bytes
-        }
-        masters_stats.append(master_stat)
+            masters_stats.append(master_stat)
 
     report: MastersReport = {
-        'total_masters': len(prs.slide_masters),
+        'total_masters': len(master_names),
         'total_layouts': total_layouts,
         'unused_layouts': unused_layouts,
         'total_master_media_bytes': total_master_media,
@@ -993,79 +1380,88 @@ def print_masters_report(report: MastersReport, filename: str) -> None:
         report: MastersReport from analyze_slide_masters
         filename: Name of the analyzed file
     """
-    print(f"\n{'='*80}")
-    print(f"SLIDE MASTERS REPORT: {filename}")
-    print(f"{'='*80}")
+    # Build the report in memory and write it to stdout in one call
+    out = io.StringIO()
+    print(f"\n{'='*80}", file=out)
+    print(f"SLIDE MASTERS REPORT: {filename}", file=out)
+    print(f"{'='*80}", file=out)
 
     # Summary
-    print(f"\nSUMMARY:")
-    print(f"  Total slide masters: {report['total_masters']}")
-    print(f"  Total layouts: {report['total_layouts']}")
-    print(f"  Unused layouts: {report['unused_layouts']}")
-    print(f"\n  Media in masters: {format_bytes(report['total_master_media_bytes'])}")
-    print(f"  Media in layouts: {format_bytes(report['total_layout_media_bytes'])}")
-    print(f"  Media in UNUSED layouts: {format_bytes(report['unused_layout_media_bytes'])}")
+    print(f"\nSUMMARY:", file=out)
+    print(f"  Total slide masters: {report['total_masters']}", file=out)
+    print(f"  Total layouts: {report['total_layouts']}", file=out)
+    print(f"  Unused layouts: {report['unused_layouts']}", file=out)
+    print(f"\n  Media in masters: {format_bytes(report['total_master_media_bytes'])}", file=out)
+    print(f"  Media in layouts: {format_bytes(report['total_layout_media_bytes'])}", file=out)
+    print(f"  Media in UNUSED layouts: {format_bytes(report['unused_layout_media_bytes'])}", file=out)
 
     if report['unused_layout_media_bytes'] > 0:
-        print(f"\n  ⚠️  You could save {format_bytes(report['unused_layout_media_bytes'])} by deleting unused layouts")
+        print(f"\n  ⚠️  You could save {format_bytes(report['unused_layout_media_bytes'])} by deleting unused layouts", file=out)
 
     # Details per master
     for master in report['masters']:
-        print(f"\n{'-'*80}")
+        print(f"\n{'-'*80}", file=out)
         master_name = master['master_name'] or f"Master {master['master_index']}"
-        print(f"MASTER {master['master_index']}: {master_name}")
-        print(f"{'-'*80}")
+        print(f"MASTER {master['master_index']}: {master_name}", file=out)
+        print(f"{'-'*80}", file=out)
 
         if master['media_count'] > 0:
-            print(f"  Media on master: {format_bytes(master['total_media_bytes'])} ({master['media_count']} items)")
+            print(f"  Media on master: {format_bytes(master['total_media_bytes'])} ({master['media_count']} items)", file=out)
         else:
-            print(f"  Media on master: (none)")
+            print(f"  Media on master: (none)", file=out)
 
-        print(f"  Layouts: {len(master['layouts'])} total, {format_bytes(master['total_layout_bytes'])} media")
+        print(f"  Layouts: {len(master['layouts'])} total, {format_bytes(master['total_layout_bytes'])} media", file=out)
 
         if master['unused_layout_bytes'] > 0:
-            print(f"  ⚠️  Unused layout media: {format_bytes(master['unused_layout_bytes'])}")
+            print(f"  ⚠️  Unused layout media: {format_bytes(master['unused_layout_bytes'])}", file=out)
 
-        # List layouts with media or unused status
-        layouts_with_media = [l for l in master['layouts'] if l['total_media_bytes'] > 0]
-        unused_layouts = [l for l in master['layouts'] if not l['is_used']]
+        # List layouts with media or unused status (split in one pass)
+        layouts_with_media = []
+        unused_with_no_media = []
+        for layout in master['layouts']:
+            if layout['total_media_bytes'] > 0:
+                layouts_with_media.append(layout)
+            elif not layout['is_used']:
+                unused_with_no_media.append(layout)
 
         if layouts_with_media:
-            print(f"\n  Layouts with media:")
-            for layout in sorted(layouts_with_media, key=lambda x: x['total_media_bytes'], reverse=True):
+            print(f"\n  Layouts with media:", file=out)
+            layouts_with_media.sort(key=itemgetter('total_media_bytes'), reverse=True)
+            for layout in layouts_with_media:
                 status = "UNUSED" if not layout['is_used'] else f"used by {len(layout['slides_using'])} slides"
-                print(f"    • {layout['layout_name']}: {format_bytes(layout['total_media_bytes'])} [{status}]")
+                print(f"    • {layout['layout_name']}: {format_bytes(layout['total_media_bytes'])} [{status}]", file=out)
 
-        if unused_layouts:
-            unused_with_no_media = [l for l in unused_layouts if l['total_media_bytes'] == 0]
-            if unused_with_no_media:
-                print(f"\n  Unused layouts (no media):")
-                for layout in unused_with_no_media:
-                    print(f"    • {layout['layout_name']}")
+        if unused_with_no_media:
+            print(f"\n  Unused layouts (no media):", file=out)
+            for layout in unused_with_no_media:
+                print(f"    • {layout['layout_name']}", file=out)
 
     # Recommendations
     if report['unused_layouts'] > 0:
-        print(f"\n{'='*80}")
-        print(f"RECOMMENDATIONS:")
-        print(f"{'='*80}")
-        print(f"\n  To reduce file size, consider deleting unused layouts:")
-        print(f"  1. Open the presentation in PowerPoint")
-        print(f"  2. Go to View > Slide Master")
-        print(f"  3. Right-click unused layouts and select 'Delete Layout'")
-        print(f"  4. Close the Slide Master view")
+        print(f"\n{'='*80}", file=out)
+        print(f"RECOMMENDATIONS:", file=out)
+        print(f"{'='*80}", file=out)
+        print(f"\n  To reduce file size, consider deleting unused layouts:", file=out)
+        print(f"  1. Open the presentation in PowerPoint", file=out)
+        print(f"  2. Go to View > Slide Master", file=out)
+        print(f"  3. Right-click unused layouts and select 'Delete Layout'", file=out)
+        print(f"  4. Close the Slide Master view", file=out)
 
         if report['unused_layout_media_bytes'] > 0:
-            print(f"\n  Potential savings: {format_bytes(report['unused_layout_media_bytes'])}")
+            print(f"\n  Potential savings: {format_bytes(report['unused_layout_media_bytes'])}", file=out)
 
-    print()
+    print(file=out)
+    sys.stdout.write(out.getvalue())
 
 
-def delete_unused_layouts(path: str) -> tuple[int, int, str]:
+def delete_unused_layouts(path: str, precomputed_report: MastersReport | None = None) -> tuple[int, int, str]:
     """
     Delete unused layouts from a presentation.
 
     Args:
         path: Path to the .pptx file
+        precomputed_report: MastersReport for the same file, if already computed;
+            its layout media sizes are reused instead of re-reading the layouts
 
     Returns:
         Tuple of (layouts_deleted, bytes_saved, output_path)
@@ -1082,64 +1478,127 @@ def delete_unused_layouts(path: str) -> tuple[int, int, str]:
     if file_path.suffix.lower() != '.pptx':
         raise ValueError(f"unsupported file type (expected .pptx): {path}")
 
-    # Open presentation
+    # Open the package and find the layout parts used by at least one slide
     try:
-        prs = Presentation(path)
+        zin = zipfile.ZipFile(path)
     except Exception as e:
         raise ValueError(f"failed to open .pptx: {e}")
 
-    # Build a set of used layout ids
-    used_layout_ids = set()
-    for slide in prs.slides:
-        used_layout_ids.add(id(slide.slide_layout))
-
-    # Find and delete unused layouts
-    layouts_deleted = 0
-    bytes_saved = 0
-
-    for master in prs.slide_masters:
-        # Collect unused layouts (must iterate in reverse to avoid index issues)
-        layouts_to_delete = []
-        for layout in master.slide_layouts:
-            if id(layout) not in used_layout_ids:
-                # Calculate bytes in this layout
-                layout_bytes = 0
-                for shape in layout.shapes:
-                    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                        try:
-                            layout_bytes += len(shape.image.blob)
-                        except Exception:
-                            pass
-                layouts_to_delete.append((layout, layout_bytes))
-
-        # Delete unused layouts by removing from the sldLayoutIdLst
-        sldLayoutIdLst = master._element.get_or_add_sldLayoutIdLst()
-
-        for layout, layout_bytes in layouts_to_delete:
-            try:
-                # Find and remove the sldLayoutId entry for this layout
-                for sldLayoutId in list(sldLayoutIdLst):
-                    rId = sldLayoutId.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                    if rId:
-                        rel = master.part.rels.get(rId)
-                        if rel and rel.target_part == layout.part:
-                            sldLayoutIdLst.remove(sldLayoutId)
-                            layouts_deleted += 1
-                            bytes_saved += layout_bytes
-                            logging.debug(f"Deleted layout: {layout.name}")
-                            break
-            except Exception as e:
-                logging.warning(f"Failed to delete layout {layout.name}: {e}")
-
-    # Save to new file
-    output_path = str(file_path.with_stem(file_path.stem + "_cleaned"))
-    try:
-        prs.save(output_path)
-        logging.info(f"Saved cleaned presentation to: {output_path}")
-    except Exception as e:
-        raise IOError(f"failed to save cleaned presentation: {e}")
+    with zin:
+        try:
+            master_names, slide_names = read_presentation_parts(zin)
+        except Exception as e:
+            raise ValueError(f"failed to open .pptx: {e}")
+        media_sizes = {info.filename: info.file_size for info in zin.infolist()}
+
+        # (master index, layout index) -> (layout name, media bytes), from the precomputed report
+        known_layouts = {}
+        if precomputed_report is not None:
+            for master in precomputed_report['masters']:
+                for layout in master['layouts']:
+                    known_layouts[(master['master_index'], layout['layout_index'])] = (
+                        layout['layout_name'], layout['total_media_bytes']
+                    )
+
+        used_layouts = set()
+        for slide_name in slide_names:
+            used_layouts.update(read_part_rels(zin, slide_name, RT_SLIDE_LAYOUT).values())
+
+        # Find and delete unused layouts. Only the affected masters, their .rels
+        # and [Content_Types].xml are rewritten; every other entry is copied as is.
+        layouts_deleted = 0
+        bytes_saved = 0
+        patched_parts = {}  # ZIP member name -> replacement XML bytes
+        dropped_parts = set()
+
+        for master_idx, master_name in enumerate(master_names, start=1):
+            master_xml = etree.fromstring(zin.read(master_name))
+            master_rels = read_part_rels(zin, master_name)
+            sldLayoutIdLst = master_xml.find('p:sldLayoutIdLst', NAMESPACES)
+            if sldLayoutIdLst is None:
+                continue
 
-    # Note: Orphaned media files may remain in the package.
+            # Entries are filtered into a keep list and written back in one go,
+            # rather than removed from the tree one at a time
+            kept_entries = []
+            dropped_rIds = set()
+            for layout_idx, sldLayoutId in enumerate(sldLayoutIdLst, start=1):
+                rId = sldLayoutId.get(RID_ATTR)
+                layout_part = master_rels.get(rId)
+                if layout_part is None or layout_part in used_layouts:
+                    kept_entries.append(sldLayoutId)
+                    continue
+                known_layout = known_layouts.get((master_idx, layout_idx))
+                if known_layout is not None:
+                    layout_name, layout_bytes = known_layout
+                else:
+                    # Named as in analyze_slide_masters, so logs and warnings match
+                    layout_name = f"Layout {layout_idx}"
+                    try:
+                        layout_xml = etree.fromstring(zin.read(layout_part))
+                        layout_name = layout_xml.find('p:cSld', NAMESPACES).get('name') or layout_name
+                        layout_bytes = sum(picture_sizes(
+                            layout_xml, read_part_rels(zin, layout_part), media_sizes, f"layout {layout_name}"
+                        ))
+                    except Exception as e:
+                        logging.warning(f"Failed to delete layout {layout_name}: {e}")
+                        kept_entries.append(sldLayoutId)
+                        continue
+                dropped_rIds.add(rId)
+                layout_dir, layout_file = posixpath.split(layout_part)
+                dropped_parts.add(layout_part)
+                dropped_parts.add(posixpath.join(layout_dir, '_rels', layout_file + '.rels'))
+                layouts_deleted += 1
+                bytes_saved += layout_bytes
+                logging.debug(f"Deleted layout: {layout_name}")
+
+            if not dropped_rIds:
+                continue
+            sldLayoutIdLst[:] = kept_entries
+
+            # Drop the master's relationships to the deleted layouts
+            master_dir, master_file = posixpath.split(master_name)
+            master_rels_name = posixpath.join(master_dir, '_rels', master_file + '.rels')
+            rels_xml = etree.fromstring(zin.read(master_rels_name))
+            rels_xml[:] = [rel for rel in rels_xml if rel.get('Id') not in dropped_rIds]
+            patched_parts[master_name] = etree.tostring(master_xml, xml_declaration=True, encoding='UTF-8', standalone=True)
+            patched_parts[master_rels_name] = etree.tostring(rels_xml, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+        if dropped_parts:
+            content_types = etree.fromstring(zin.read('[Content_Types].xml'))
+            content_types[:] = [
+                entry for entry in content_types
+                if entry.get('PartName', '').lstrip('/') not in dropped_parts
+            ]
+            patched_parts['[Content_Types].xml'] = etree.tostring(
+                content_types, xml_declaration=True, encoding='UTF-8', standalone=True
+            )
+
+        # Write the new package entry by entry, streaming unchanged members
+        output_path = str(file_path.with_stem(file_path.stem + "_cleaned"))
+        try:
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+                for info in zin.infolist():
+                    if info.filename in dropped_parts:
+                        continue
+                    if info.filename in patched_parts:
+                        zout.writestr(info, patched_parts[info.filename])
+                        continue
+                    # Already-compressed media gains nothing from deflate, so store it
+                    out_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    out_info.external_attr = info.external_attr
+                    out_info.file_size = info.file_size  # lets zipfile decide on ZIP64 up front
+                    if info.filename.lower().endswith(COMPRESSED_MEDIA_EXTENSIONS):
+                        out_info.compress_type = zipfile.ZIP_STORED
+                    else:
+                        out_info.compress_type = zipfile.ZIP_DEFLATED
+                    with zin.open(info) as src, zout.open(out_info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+            logging.info(f"Saved cleaned presentation to: {output_path}")
+        except Exception as e:
+            raise IOError(f"failed to save cleaned presentation: {e}")
+
+    # Note: Media used only by the deleted layouts may remain in the package.
     # Use PowerPoint's "Compress Pictures" or File > Info > Compress Media
     # to fully clean up after deleting layouts.
 
@@ -1251,7 +1710,9 @@ def main() -> int:
 
             if report['unused_layouts'] > 0:
                 # Delete unused layouts
-                layouts_deleted, bytes_saved, output_path = delete_unused_layouts(args.input_path)
+                layouts_deleted, bytes_saved, output_path = delete_unused_layouts(
+                    args.input_path, precomputed_report=report
+                )
                 print(f"\n{'='*80}")
                 print(f"CLEANUP COMPLETE")
                 print(f"{'='*80}")
@@ -0,0 +1,7 @@
+"""
+Shared pytest configuration for the analyzer tests.
+"""
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: large-deck stress tests (deselect with -m 'not slow')")
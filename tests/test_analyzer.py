@@ -4,13 +4,22 @@ Tests for the PowerPoint Heavy Slides Analyzer.
 
 import io
 import json
+import logging
 import os
 import pytest
+import shutil
+import struct
 import tempfile
+import time
+import zipfile
+import zlib
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from PIL import Image
+from PIL import Image, ImageColor
 
 from pptx import Presentation
+from pptx.oxml.shapes.picture import CT_Picture
 from pptx.util import Inches
 
 # Import the module under test
@@ -19,12 +28,80 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import pptx_heavy_slides
 
 
+# Hand-built analyzer output for the writer tests, so they need no deck
+SAMPLE_RESULTS = [
+    {
+        'slide_index': 1,
+        'slide_title': "Test",
+        'total_media_bytes': 12345,
+        'image_bytes': 12345,
+        'video_bytes': 0,
+        'audio_bytes': 0,
+        'other_media_bytes': 0,
+        'media_items': [
+            {
+                'type': 'image',
+                'size_bytes': 12345,
+                'filename': 'image1.png',
+                'content_type': 'image/png',
+                'relationship_id': 'rId2',
+                'shared': False,
+            }
+        ],
+    }
+]
+
+
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Build a PNG chunk (length, type, data, CRC)."""
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+@lru_cache(maxsize=None)
 def create_test_image(width: int = 100, height: int = 100, color: str = 'red') -> bytes:
-    """Create a simple test image and return as bytes."""
-    img = Image.new('RGB', (width, height), color=color)
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format='PNG')
-    return img_bytes.getvalue()
+    """Create a simple test image and return as bytes (cached; callers wrap it in BytesIO)."""
+    # Same flat-color encoder as create_sample.py: unfiltered rows deflated at
+    # level 1, several times faster than Pillow's adaptive-filter PNG encoder
+    row = b'\x00' + bytes(ImageColor.getrgb(color)) * width
+    compressor = zlib.compressobj(1)
+    idat = b''.join([compressor.compress(row) for _ in range(height)]) + compressor.flush()
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + png_chunk(b'IHDR', ihdr)
+        + png_chunk(b'IDAT', idat)
+        + png_chunk(b'IEND', b'')
+    )
+
+
+def load_default_template_bytes() -> bytes:
+    """Serialize python-pptx's default template once so tests need not re-read it."""
+    stream = io.BytesIO()
+    Presentation().save(stream)
+    return stream.getvalue()
+
+
+TEMPLATE_BYTES = load_default_template_bytes()
+
+
+def new_presentation():
+    """Return a fresh, independent presentation built from the cached default template."""
+    return Presentation(io.BytesIO(TEMPLATE_BYTES))
+
+
+def add_picture_to_template(template, img_bytes: bytes) -> None:
+    """Embed a picture directly on a slide master or layout (python-pptx has no API for this)."""
+    image_part, rId = template.part.get_or_add_image_part(io.BytesIO(img_bytes))
+    pic = CT_Picture.new_pic(100, "Template Picture", "", rId, 0, 0, Inches(1), Inches(1))
+    template.shapes._spTree.append(pic)
+
+
+def save_to_stream(prs) -> io.BytesIO:
+    """Save a presentation into memory, rewound for analysis."""
+    stream = io.BytesIO()
+    prs.save(stream)
+    stream.seek(0)
+    return stream
 
 
 @pytest.fixture
@@ -34,28 +111,112 @@ def temp_dir():
         yield Path(tmpdir)
 
 
-def test_single_slide_with_image(temp_dir):
-    """Test analysis of a single-slide deck with one image."""
-    # Create a presentation with one slide and one image
-    prs = Presentation()
+def make_single_image_deck(title: str | None, width: int = 100, height: int = 100,
+                           color: str = 'red', layout: int = 5):
+    """Return a one-slide presentation holding one picture; no title when title is None."""
+    prs = new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[layout])
+    if title is not None:
+        slide.shapes.title.text = title
+    img_stream = io.BytesIO(create_test_image(width, height, color))
+    slide.shapes.add_picture(img_stream, Inches(1), Inches(1), width=Inches(2))
+    return prs
+
+
+def build_single_image_deck(path: Path) -> None:
+    """One titled slide with one image."""
+    make_single_image_deck("Test Slide", 200, 200, 'blue').save(str(path))
+
+
+def build_shared_image_deck(path: Path) -> None:
+    """Three slides showing the same image."""
+    prs = new_presentation()
     prs.slide_width = Inches(10)
     prs.slide_height = Inches(7.5)
 
-    slide = prs.slides.add_slide(prs.slide_layouts[5])  # Blank layout
+    img_bytes = create_test_image(300, 300, 'green')
+    for i in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = f"Slide {i+1}"
+        slide.shapes.add_picture(io.BytesIO(img_bytes), Inches(1), Inches(1), width=Inches(2))
 
-    # Add title
-    title_shape = slide.shapes.title
-    if title_shape:
-        title_shape.text = "Test Slide"
+    prs.save(str(path))
 
-    # Add an image
-    img_bytes = create_test_image(200, 200, 'blue')
-    img_stream = io.BytesIO(img_bytes)
-    slide.shapes.add_picture(img_stream, Inches(1), Inches(1), width=Inches(3))
 
-    # Save presentation
-    pptx_path = temp_dir / "single_image.pptx"
-    prs.save(str(pptx_path))
+def build_empty_deck(path: Path) -> None:
+    """Three text-only slides."""
+    prs = new_presentation()
+    for i in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])  # Title and content
+        slide.shapes.title.text = f"Slide {i+1}"
+
+    prs.save(str(path))
+
+
+# Ranked deck slides in deck order: (title, image side in pixels, color, display width)
+RANKED_DECK_SPECS = (
+    ("Small Image", 50, 'red', Inches(1)),
+    ("Large Image", 1000, 'blue', Inches(4)),
+    ("Medium Image", 300, 'green', Inches(2)),
+)
+
+
+def build_ranked_deck(path: Path) -> None:
+    """One slide per RANKED_DECK_SPECS entry, each with its own image."""
+    prs = new_presentation()
+    for title, size, color, width in RANKED_DECK_SPECS:
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = title
+        img_stream = io.BytesIO(create_test_image(size, size, color))
+        slide.shapes.add_picture(img_stream, Inches(1), Inches(1), width=width)
+
+    prs.save(str(path))
+
+
+@pytest.fixture(scope="session")
+def deck_dir(tmp_path_factory):
+    """Session directory holding the prebuilt canonical decks."""
+    return tmp_path_factory.mktemp("decks")
+
+
+@pytest.fixture(scope="session")
+def single_image_pptx(deck_dir):
+    path = deck_dir / "single_image.pptx"
+    build_single_image_deck(path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def shared_image_pptx(deck_dir):
+    path = deck_dir / "shared_image.pptx"
+    build_shared_image_deck(path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def empty_pptx(deck_dir):
+    path = deck_dir / "empty.pptx"
+    build_empty_deck(path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def ranked_pptx(deck_dir):
+    path = deck_dir / "ranked.pptx"
+    build_ranked_deck(path)
+    return path
+
+
+def copy_deck(src: Path, temp_dir: Path) -> Path:
+    """Copy a prebuilt session deck into the test's own directory."""
+    dest = temp_dir / src.name
+    shutil.copyfile(src, dest)
+    return dest
+
+
+def test_single_slide_with_image(temp_dir, single_image_pptx):
+    """Test analysis of a single-slide deck with one image."""
+    pptx_path = copy_deck(single_image_pptx, temp_dir)
 
     # Analyze
     results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path))
@@ -73,29 +234,9 @@ def test_single_slide_with_image(temp_dir):
     assert results[0]['media_items'][0]['shared'] is False
 
 
-def test_shared_media_ignore_mode(temp_dir):
+def test_shared_media_ignore_mode(temp_dir, shared_image_pptx):
     """Test that shared media is counted only on first slide by default."""
-    # Create a presentation with same image on multiple slides
-    prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(7.5)
-
-    # Create a single image to share
-    img_bytes = create_test_image(300, 300, 'green')
-
-    # Add 3 slides with the same image
-    for i in range(3):
-        slide = prs.slides.add_slide(prs.slide_layouts[5])
-        title = slide.shapes.title
-        if title:
-            title.text = f"Slide {i+1}"
-
-        img_stream = io.BytesIO(img_bytes)
-        slide.shapes.add_picture(img_stream, Inches(1), Inches(1), width=Inches(2))
-
-    # Save presentation
-    pptx_path = temp_dir / "shared_image.pptx"
-    prs.save(str(pptx_path))
+    pptx_path = copy_deck(shared_image_pptx, temp_dir)
 
     # Analyze with default (ignore shared media)
     results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path), include_shared_media=False)
@@ -118,28 +259,9 @@ def test_shared_media_ignore_mode(temp_dir):
             assert item['shared'] is True
 
 
-def test_shared_media_include_mode(temp_dir):
+def test_shared_media_include_mode(temp_dir, shared_image_pptx):
     """Test that shared media is counted on every slide with --include-shared-media."""
-    # Create a presentation with same image on multiple slides
-    prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(7.5)
-
-    img_bytes = create_test_image(300, 300, 'yellow')
-
-    # Add 3 slides with the same image
-    for i in range(3):
-        slide = prs.slides.add_slide(prs.slide_layouts[5])
-        title = slide.shapes.title
-        if title:
-            title.text = f"Slide {i+1}"
-
-        img_stream = io.BytesIO(img_bytes)
-        slide.shapes.add_picture(img_stream, Inches(1), Inches(1), width=Inches(2))
-
-    # Save presentation
-    pptx_path = temp_dir / "shared_image_include.pptx"
-    prs.save(str(pptx_path))
+    pptx_path = copy_deck(shared_image_pptx, temp_dir)
 
     # Analyze with include_shared_media=True
     results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path), include_shared_media=True)
@@ -152,21 +274,9 @@ def test_shared_media_include_mode(temp_dir):
     assert len(set(sizes)) == 1, "All slides should have the same size"
 
 
-def test_empty_deck(temp_dir):
+def test_empty_deck(temp_dir, empty_pptx):
     """Test analysis of a deck with no media."""
-    # Create a presentation with slides but no media
-    prs = Presentation()
-
-    # Add 3 slides with just text
-    for i in range(3):
-        slide = prs.slides.add_slide(prs.slide_layouts[1])  # Title and content
-        title = slide.shapes.title
-        if title:
-            title.text = f"Slide {i+1}"
-
-    # Save presentation
-    pptx_path = temp_dir / "empty.pptx"
-    prs.save(str(pptx_path))
+    pptx_path = copy_deck(empty_pptx, temp_dir)
 
     # Analyze
     results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path))
@@ -180,43 +290,17 @@ def test_empty_deck(temp_dir):
         assert len(result['media_items']) == 0
 
 
-def test_multiple_images_different_sizes(temp_dir):
+def test_multiple_images_different_sizes(temp_dir, ranked_pptx):
     """Test deck with multiple images of different sizes for proper ranking."""
-    prs = Presentation()
-
-    # Slide 1: small image
-    slide1 = prs.slides.add_slide(prs.slide_layouts[5])
-    if slide1.shapes.title:
-        slide1.shapes.title.text = "Small Image"
-    img_small = io.BytesIO(create_test_image(50, 50, 'red'))
-    slide1.shapes.add_picture(img_small, Inches(1), Inches(1), width=Inches(1))
-
-    # Slide 2: large image
-    slide2 = prs.slides.add_slide(prs.slide_layouts[5])
-    if slide2.shapes.title:
-        slide2.shapes.title.text = "Large Image"
-    img_large = io.BytesIO(create_test_image(1000, 1000, 'blue'))
-    slide2.shapes.add_picture(img_large, Inches(1), Inches(1), width=Inches(4))
-
-    # Slide 3: medium image
-    slide3 = prs.slides.add_slide(prs.slide_layouts[5])
-    if slide3.shapes.title:
-        slide3.shapes.title.text = "Medium Image"
-    img_medium = io.BytesIO(create_test_image(300, 300, 'green'))
-    slide3.shapes.add_picture(img_medium, Inches(1), Inches(1), width=Inches(2))
-
-    # Save presentation
-    pptx_path = temp_dir / "ranked.pptx"
-    prs.save(str(pptx_path))
+    pptx_path = copy_deck(ranked_pptx, temp_dir)
 
     # Analyze
     results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path))
 
-    # Should be sorted by size descending
-    assert len(results) == 3
-    assert results[0]['slide_title'] == "Large Image"
-    assert results[1]['slide_title'] == "Medium Image"
-    assert results[2]['slide_title'] == "Small Image"
+    # Should be sorted by size descending, i.e. by image side
+    titles_desc = [spec[0] for spec in sorted(RANKED_DECK_SPECS, key=itemgetter(1), reverse=True)]
+    assert [r['slide_title'] for r in results] == titles_desc
+    assert titles_desc == ["Large Image", "Medium Image", "Small Image"]
 
     # Sizes should be descending
     assert results[0]['total_media_bytes'] > results[1]['total_media_bytes']
@@ -249,62 +333,37 @@ def test_corrupt_pptx(temp_dir):
         pptx_heavy_slides.analyze_pptx_media(str(corrupt_path))
 
 
-def test_format_bytes():
+@pytest.mark.parametrize("n,expected", [
+    (0, "0.0 MB"),
+    (500, "500 B"),
+    (1024, "1.0 KB"),
+    (1024 * 1024, "1.0 MB"),
+    (1536 * 1024, "1.5 MB"),
+    (1024 * 1024 * 1024, "1.0 GB"),
+    (1500.0, "1.5 KB"),
+    (1024 * 1024 - 0.5, "1024.0 KB"),
+])
+def test_format_bytes(n, expected):
     """Test the byte formatting function."""
-    assert pptx_heavy_slides.format_bytes(0) == "0.0 MB"
-    assert pptx_heavy_slides.format_bytes(500) == "500 B"
-    assert pptx_heavy_slides.format_bytes(1024) == "1.0 KB"
-    assert pptx_heavy_slides.format_bytes(1024 * 1024) == "1.0 MB"
-    assert pptx_heavy_slides.format_bytes(1536 * 1024) == "1.5 MB"
-    assert pptx_heavy_slides.format_bytes(1024 * 1024 * 1024) == "1.0 GB"
+    assert pptx_heavy_slides.format_bytes(n) == expected
 
 
 def test_json_output(temp_dir):
     """Test JSON output generation."""
-    # Create a simple presentation
-    prs = Presentation()
-    slide = prs.slides.add_slide(prs.slide_layouts[5])
-    if slide.shapes.title:
-        slide.shapes.title.text = "Test"
-    img = io.BytesIO(create_test_image(100, 100, 'red'))
-    slide.shapes.add_picture(img, Inches(1), Inches(1), width=Inches(2))
-
-    pptx_path = temp_dir / "test.pptx"
-    prs.save(str(pptx_path))
-
-    # Analyze and write JSON
-    results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path))
     json_path = temp_dir / "output.json"
-    pptx_heavy_slides.write_json_output(results, str(json_path))
+    pptx_heavy_slides.write_json_output(SAMPLE_RESULTS, str(json_path))
 
     # Verify JSON file
     assert json_path.exists()
-    with open(json_path) as f:
-        data = json.load(f)
+    data = json.loads(json_path.read_bytes())
 
-    assert isinstance(data, list)
-    assert len(data) == 1
-    assert data[0]['slide_index'] == 1
-    assert data[0]['slide_title'] == "Test"
+    assert data == SAMPLE_RESULTS
 
 
 def test_csv_output(temp_dir):
     """Test CSV output generation."""
-    # Create a simple presentation
-    prs = Presentation()
-    slide = prs.slides.add_slide(prs.slide_layouts[5])
-    if slide.shapes.title:
-        slide.shapes.title.text = "CSV Test"
-    img = io.BytesIO(create_test_image(100, 100, 'blue'))
-    slide.shapes.add_picture(img, Inches(1), Inches(1), width=Inches(2))
-
-    pptx_path = temp_dir / "test.pptx"
-    prs.save(str(pptx_path))
-
-    # Analyze and write CSV
-    results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path))
     csv_path = temp_dir / "output.csv"
-    pptx_heavy_slides.write_csv_output(results, str(csv_path))
+    pptx_heavy_slides.write_csv_output(SAMPLE_RESULTS, str(csv_path))
 
     # Verify CSV file
     assert csv_path.exists()
@@ -315,21 +374,378 @@ def test_csv_output(temp_dir):
     assert 'rank' in lines[0]
     assert 'slide_index' in lines[0]
     assert 'slide_title' in lines[0]
-    assert 'CSV Test' in lines[1]
+    assert lines[1].strip() == '1,1,Test,12345,12345,0,0,0'
+
 
+def test_json_output_end_to_end(temp_dir, single_image_pptx):
+    """Test the full analyze-then-write pipeline on a real deck."""
+    pptx_path = copy_deck(single_image_pptx, temp_dir)
 
-def test_slide_without_title(temp_dir):
+    results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path))
+    json_path = temp_dir / "output.json"
+    pptx_heavy_slides.write_json_output(results, str(json_path))
+
+    data = json.loads(json_path.read_bytes())
+
+    assert isinstance(data, list)
+    assert len(data) == 1
+    assert data[0]['slide_index'] == 1
+    assert data[0]['slide_title'] == "Test Slide"
+
+
+def test_slide_without_title():
     """Test that slides without titles are handled correctly."""
-    prs = Presentation()
-    slide = prs.slides.add_slide(prs.slide_layouts[6])  # Blank layout, no title
+    prs = make_single_image_deck(None, color='purple', layout=6)  # Blank layout, no title
+    results = pptx_heavy_slides.analyze_pptx_media_from_stream(save_to_stream(prs))
+
+    assert len(results) == 1
+    assert results[0]['slide_title'] is None
+
+
+def test_get_image_dimensions_returns_format():
+    """Test that pixel size, display size and format are reported for a picture."""
+    prs = new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    img_bytes = create_test_image(400, 200, 'red')
+    picture = slide.shapes.add_picture(io.BytesIO(img_bytes), Inches(1), Inches(1), width=Inches(2))
+
+    dimensions, img_format = pptx_heavy_slides.get_image_dimensions(img_bytes, picture)
+
+    assert img_format == 'PNG'
+    assert dimensions['pixel_width'] == 400
+    assert dimensions['pixel_height'] == 200
+    assert dimensions['display_width_px'] == 192
+    assert dimensions['display_height_px'] == 96
+
+
+def test_get_image_dimensions_scaled_group():
+    """Test that a picture in a resized group is measured at its size on the slide."""
+    prs = new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    group = slide.shapes.add_group_shape()
+    img_bytes = create_test_image(2000, 1000, 'blue')
+    picture = group.shapes.add_picture(io.BytesIO(img_bytes), Inches(1), Inches(1), width=Inches(2))
+
+    # Scale the group 4x; its children keep their child-space size
+    group.width = group.width * 4
+    group.height = group.height * 4
+
+    dimensions, _ = pptx_heavy_slides.get_image_dimensions(img_bytes, picture)
 
-    img = io.BytesIO(create_test_image(100, 100, 'purple'))
-    slide.shapes.add_picture(img, Inches(1), Inches(1), width=Inches(2))
+    assert dimensions['display_width_px'] == 768
+    assert dimensions['display_height_px'] == 384
 
-    pptx_path = temp_dir / "no_title.pptx"
+
+def test_optimization_oversized_image(temp_dir):
+    """Test that an image far larger than its display size is flagged."""
+    prs = make_single_image_deck("Oversized", 2000, 1000, 'blue')
+    pptx_path = temp_dir / "oversized.pptx"
+    prs.save(str(pptx_path))
+
+    opportunities = pptx_heavy_slides.analyze_optimization_opportunities(str(pptx_path))
+
+    assert len(opportunities) == 1
+    opp = opportunities[0]
+    assert opp['opportunity_type'] == 'oversized_resolution'
+    assert opp['slide_index'] == 1
+    assert opp['slide_title'] == "Oversized"
+    assert opp['current_format'] == 'PNG'
+    assert opp['current_dimensions'] == "2000x1000"
+    assert opp['display_dimensions'] == "192x96"
+    assert opp['recommended_dimensions'] == "384x192"
+    assert opp['severity'] == 'high'
+    assert opp['is_shared'] is False
+
+
+def test_sniff_image_header():
+    """Test PNG/JPEG header parsing matches Pillow; unknown or truncated headers fall back."""
+    for fmt in ('PNG', 'JPEG'):
+        img_bytes = io.BytesIO()
+        Image.new('RGB', (321, 123), color='red').save(img_bytes, format=fmt)
+        blob = img_bytes.getvalue()
+        assert pptx_heavy_slides.sniff_image_header(blob) == (321, 123, fmt)
+
+        # A header cut short anywhere is unreadable, not an error
+        assert pptx_heavy_slides.sniff_image_header(blob[:20]) is None
+        for length in range(len(blob) // 4):
+            assert pptx_heavy_slides.sniff_image_header(blob[:length]) in (None, (321, 123, fmt))
+
+    gif_bytes = io.BytesIO()
+    Image.new('RGB', (10, 10)).save(gif_bytes, format='GIF')
+    assert pptx_heavy_slides.sniff_image_header(gif_bytes.getvalue()) is None
+    assert pptx_heavy_slides.sniff_image_header(b'\xff\xd8\xff') is None
+
+
+def test_optimization_shared_image_reported_once(temp_dir):
+    """Test that a shared oversized image is reported once, on its first slide."""
+    prs = new_presentation()
+    img_bytes = create_test_image(2000, 1000, 'green')
+
+    for i in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = f"Slide {i+1}"
+        slide.shapes.add_picture(io.BytesIO(img_bytes), Inches(1), Inches(1), width=Inches(2))
+
+    pptx_path = temp_dir / "shared_oversized.pptx"
+    prs.save(str(pptx_path))
+
+    opportunities = pptx_heavy_slides.analyze_optimization_opportunities(str(pptx_path))
+
+    assert len(opportunities) == 1
+    assert opportunities[0]['slide_index'] == 1
+    assert opportunities[0]['slide_title'] == "Slide 1"
+    assert opportunities[0]['is_shared'] is True
+
+
+def test_image_repeated_on_one_slide_not_shared(temp_dir):
+    """Test that an image used twice on the same slide is not reported as shared."""
+    prs = new_presentation()
+    img_bytes = create_test_image(2000, 1000, 'green')
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide.shapes.add_picture(io.BytesIO(img_bytes), Inches(1), Inches(1), width=Inches(2))
+    slide.shapes.add_picture(io.BytesIO(img_bytes), Inches(4), Inches(1), width=Inches(2))
+
+    pptx_path = temp_dir / "repeated.pptx"
     prs.save(str(pptx_path))
 
     results = pptx_heavy_slides.analyze_pptx_media(str(pptx_path))
+    assert len(results[0]['media_items']) == 2
+    assert all(item['shared'] is False for item in results[0]['media_items'])
 
-    assert len(results) == 1
-    assert results[0]['slide_title'] is None
+    opportunities = pptx_heavy_slides.analyze_optimization_opportunities(str(pptx_path))
+    assert len(opportunities) == 1
+    assert opportunities[0]['is_shared'] is False
+
+
+def test_grouped_picture_counted():
+    """Test that pictures nested inside group shapes are included."""
+    prs = new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    group = slide.shapes.add_group_shape()
+    inner_group = group.shapes.add_group_shape()
+    img = io.BytesIO(create_test_image(100, 100, 'orange'))
+    inner_group.shapes.add_picture(img, Inches(1), Inches(1), width=Inches(2))
+
+    results = pptx_heavy_slides.analyze_pptx_media_from_stream(save_to_stream(prs))
+
+    assert len(results[0]['media_items']) == 1
+    assert results[0]['image_bytes'] > 0
+
+
+def test_titles_and_placeholder_pictures_match_python_pptx():
+    """Test that titles are read like python-pptx and filled picture placeholders are skipped."""
+    prs = new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[8])  # Picture with Caption
+    slide.shapes.title.text = "First line\nSecond paragraph"
+    slide.shapes.title.text_frame.paragraphs[0].add_line_break()
+    slide.placeholders[1].insert_picture(io.BytesIO(create_test_image(100, 100, 'red')))
+    slide.shapes.add_picture(io.BytesIO(create_test_image(50, 50, 'blue')), Inches(1), Inches(1))
+
+    blank_title = prs.slides.add_slide(prs.slide_layouts[0])
+    blank_title.shapes.title.text = "   "
+
+    stream = save_to_stream(prs)
+    results = sorted(pptx_heavy_slides.analyze_pptx_media_from_stream(stream), key=lambda x: x['slide_index'])
+    stream.seek(0)
+    reloaded = Presentation(stream)
+
+    # python-pptx's own reading of each title, stripped, with blank as None
+    expected_titles = [s.shapes.title.text.strip() or None for s in reloaded.slides]
+    assert [r['slide_title'] for r in results] == expected_titles
+    assert results[0]['slide_title'] == "First line\v\nSecond paragraph"
+    assert results[1]['slide_title'] is None
+    assert len(results[0]['media_items']) == 1
+    assert results[0]['media_items'][0]['filename'].endswith('.png')
+
+
+def test_video_and_audio():
+    """Test that embedded video and audio are categorized and included in totals."""
+    prs = new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide.shapes.add_movie(
+        io.BytesIO(b'\x00' * 5000), Inches(1), Inches(1), Inches(2), Inches(2),
+        mime_type='video/mp4'
+    )
+    slide.shapes.add_movie(
+        io.BytesIO(b'\x01' * 3000), Inches(4), Inches(1), Inches(1), Inches(1),
+        mime_type='audio/mpeg'
+    )
+
+    results = pptx_heavy_slides.analyze_pptx_media_from_stream(save_to_stream(prs))
+
+    assert results[0]['video_bytes'] == 5000
+    assert results[0]['audio_bytes'] == 3000
+    assert results[0]['total_media_bytes'] == 8000
+    assert sorted(item['type'] for item in results[0]['media_items']) == ['audio', 'video']
+
+
+def test_powerpoint_audio_file():
+    """Test that audio in PowerPoint's own form (a:audioFile plus p14:media) counts as audio."""
+    prs = new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    audio = slide.shapes.add_movie(
+        io.BytesIO(b'\x01' * 3000), Inches(4), Inches(1), Inches(1), Inches(1),
+        mime_type='audio/mpeg'
+    )
+    # python-pptx writes every clip as a:videoFile; PowerPoint uses a:audioFile for audio
+    video_file = audio._element.find('p:nvPicPr/p:nvPr/a:videoFile', pptx_heavy_slides.NAMESPACES)
+    video_file.tag = f"{{{pptx_heavy_slides.NAMESPACES['a']}}}audioFile"
+    assert audio._element.find('.//p14:media', pptx_heavy_slides.NAMESPACES) is not None
+
+    results = pptx_heavy_slides.analyze_pptx_media_from_stream(save_to_stream(prs))
+
+    assert results[0]['audio_bytes'] == 3000
+    assert results[0]['image_bytes'] == 0
+    assert [item['type'] for item in results[0]['media_items']] == ['audio']
+
+
+def build_shared_image_stream(n_slides: int) -> io.BytesIO:
+    """An in-memory deck of n_slides blank slides that all show the same image."""
+    prs = new_presentation()
+    img_bytes = create_test_image(100, 100, 'red')
+    layout = prs.slide_layouts[6]
+    for _ in range(n_slides):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.add_picture(io.BytesIO(img_bytes), Inches(1), Inches(1))
+    return save_to_stream(prs)
+
+
+def time_media_analysis(stream: io.BytesIO, repeats: int = 3) -> float:
+    """Best-of-N wall time of analyze_pptx_media_from_stream, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        stream.seek(0)
+        start = time.perf_counter()
+        results = pptx_heavy_slides.analyze_pptx_media_from_stream(stream)
+        timings.append(time.perf_counter() - start)
+    assert sum(1 for r in results if r['total_media_bytes'] > 0) == 1
+    return min(timings)
+
+
+@pytest.mark.slow
+def test_many_slides_scale_linearly():
+    """Test that analysis time grows linearly with slide count for a shared image."""
+    small = time_media_analysis(build_shared_image_stream(100))
+    large = time_media_analysis(build_shared_image_stream(1000))
+
+    # 10x the slides measured at ~9.5x the time; quadratic work would be ~100x
+    ratio = large / small
+    assert ratio < 20, f"100 slides: {small:.3f}s, 1000 slides: {large:.3f}s (ratio {ratio:.1f})"
+
+
+def test_masters_report_unused_layout_media(temp_dir):
+    """Test that media on masters and unused layouts is reported."""
+    prs = new_presentation()
+    master = prs.slide_masters[0]
+    add_picture_to_template(master, create_test_image(100, 100, 'red'))
+    add_picture_to_template(prs.slide_layouts[7], create_test_image(200, 200, 'blue'))
+
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "Uses layout 6"
+
+    pptx_path = temp_dir / "masters.pptx"
+    prs.save(str(pptx_path))
+
+    report = pptx_heavy_slides.analyze_slide_masters(str(pptx_path))
+
+    assert report['total_masters'] == 1
+    assert report['total_layouts'] == 11
+    assert report['unused_layouts'] == 10
+    assert report['total_master_media_bytes'] > 0
+    assert report['unused_layout_media_bytes'] > 0
+    assert report['unused_layout_media_bytes'] == report['total_layout_media_bytes']
+
+    layouts = report['masters'][0]['layouts']
+    assert layouts[5]['is_used'] is True
+    assert layouts[5]['slides_using'] == [1]
+    assert layouts[7]['is_used'] is False
+    assert layouts[7]['media_count'] == 1
+    assert layouts[7]['image_bytes'] == report['unused_layout_media_bytes']
+
+
+def test_masters_report_layout_at_custom_partname(temp_dir):
+    """Test that layouts are matched by relationship, not by their folder name."""
+    prs = new_presentation()
+    prs.slides.add_slide(prs.slide_layouts[5])
+    stream = save_to_stream(prs)
+
+    # Move layout 6 out of ppt/slideLayouts/, rewriting every reference to it
+    old_name, new_name = b'slideLayouts/slideLayout6.xml', b'customLayouts/slideLayout6.xml'
+    pptx_path = temp_dir / "custom_layout.pptx"
+    with zipfile.ZipFile(stream) as zin, zipfile.ZipFile(pptx_path, 'w') as zout:
+        for info in zin.infolist():
+            name = info.filename.replace(old_name.decode(), new_name.decode())
+            name = name.replace('slideLayouts/_rels/slideLayout6.xml.rels', 'customLayouts/_rels/slideLayout6.xml.rels')
+            zout.writestr(name, zin.read(info).replace(old_name, new_name))
+
+    report = pptx_heavy_slides.analyze_slide_masters(str(pptx_path))
+
+    assert report['unused_layouts'] == 10
+    assert report['masters'][0]['layouts'][5]['slides_using'] == [1]
+    assert pptx_heavy_slides.delete_unused_layouts(str(pptx_path))[0] == 10
+
+
+def test_masters_report_skips_placeholder_pictures(temp_dir):
+    """Test that a picture placeholder on a layout is not counted as layout media."""
+    prs = new_presentation()
+    layout = prs.slide_layouts[7]
+    add_picture_to_template(layout, create_test_image(200, 200, 'blue'))
+    add_picture_to_template(layout, create_test_image(100, 100, 'red'))
+    layout.shapes._spTree[-1].nvPicPr.nvPr.get_or_add_ph()
+    prs.slides.add_slide(prs.slide_layouts[5])
+
+    pptx_path = temp_dir / "placeholder.pptx"
+    prs.save(str(pptx_path))
+
+    report = pptx_heavy_slides.analyze_slide_masters(str(pptx_path))
+
+    assert report['masters'][0]['layouts'][7]['media_count'] == 1
+
+
+def test_delete_unused_layouts(temp_dir, caplog):
+    """Test that unused layouts are removed and the original file is preserved."""
+    prs = new_presentation()
+    add_picture_to_template(prs.slide_layouts[7], create_test_image(200, 200, 'blue'))
+    prs.slides.add_slide(prs.slide_layouts[5])
+    prs.slides.add_slide(prs.slide_layouts[1])
+
+    pptx_path = temp_dir / "layouts.pptx"
+    prs.save(str(pptx_path))
+    original_bytes = pptx_path.read_bytes()
+
+    with caplog.at_level(logging.DEBUG):
+        layouts_deleted, bytes_saved, output_path = pptx_heavy_slides.delete_unused_layouts(str(pptx_path))
+
+    assert layouts_deleted == 9
+    assert "Deleted layout: Title Slide" in caplog.text  # Logged by layout name, not part path
+    assert bytes_saved > 0
+    assert output_path == str(temp_dir / "layouts_cleaned.pptx")
+    assert pptx_path.read_bytes() == original_bytes
+
+    report = pptx_heavy_slides.analyze_slide_masters(output_path)
+    assert report['total_layouts'] == 2
+    assert report['unused_layouts'] == 0
+
+    cleaned = Presentation(output_path)
+    assert [slide.slide_layout.name for slide in cleaned.slides] == ["Title Only", "Title and Content"]
+
+    with zipfile.ZipFile(output_path) as zf:
+        layout_parts = [name for name in zf.namelist() if name.startswith('ppt/slideLayouts/slideLayout')]
+        content_types = zf.read('[Content_Types].xml').decode()
+    assert len(layout_parts) == 2
+    assert content_types.count('/ppt/slideLayouts/') == 2
+
+
+def test_delete_unused_layouts_reuses_report(temp_dir):
+    """Test that a precomputed masters report gives the same result."""
+    prs = new_presentation()
+    add_picture_to_template(prs.slide_layouts[7], create_test_image(200, 200, 'blue'))
+    prs.slides.add_slide(prs.slide_layouts[5])
+
+    pptx_path = temp_dir / "layouts.pptx"
+    prs.save(str(pptx_path))
+
+    report = pptx_heavy_slides.analyze_slide_masters(str(pptx_path))
+    expected = pptx_heavy_slides.delete_unused_layouts(str(pptx_path))
+    assert pptx_heavy_slides.delete_unused_layouts(str(pptx_path), precomputed_report=report) == expected
+    assert expected[1] == report['unused_layout_media_bytes']